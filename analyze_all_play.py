@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+All-play records and expected wins from weekly RFFL scores
+
+A team's all-play record for a week is how it would have done against every
+other team in the league that week. Summed over a season this gives expected
+wins, and the gap to actual wins measures schedule luck directly.
+
+The weekly file may hold several leagues (league_id); the master DB describes
+one of them, so actual records and luck are only matched for that league.
+"""
+
+import bisect
+import csv
+import os
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+
+
+def load_weekly_scores(filename: str) -> List[Dict[str, Any]]:
+    """Load weekly scores (season_year, week, team_code, score[, league_id])"""
+    scores = []
+    with open(filename, 'r', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            score = row['score'].strip()
+            if not score:
+                continue
+            try:
+                scores.append({
+                    'league': row.get('league_id', '') or '',
+                    'season': int(row['season_year']),
+                    'week': int(row['week']),
+                    'team': row['team_code'],
+                    'score': float(score),
+                })
+            except ValueError:
+                pass
+    return scores
+
+
+def compute_all_play(scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Compute all-play W-L-T and expected wins for every team-week in one batch
+
+    Instead of comparing every pair of teams, all rows are sorted once by
+    (league, season, week, score). Within each week the number of teams a
+    score beats is its rank among the week's sorted scores, and ties are the
+    width of its equal-score run, both found by binary search.
+    """
+    ordered = sorted(scores, key=lambda s: (s['league'], s['season'], s['week'], s['score']))
+
+    results = []
+    start = 0
+    while start < len(ordered):
+        group_key = (ordered[start]['league'], ordered[start]['season'], ordered[start]['week'])
+        end = start
+        while end < len(ordered) and (
+            ordered[end]['league'], ordered[end]['season'], ordered[end]['week']
+        ) == group_key:
+            end += 1
+
+        week_scores = [s['score'] for s in ordered[start:end]]
+        opponents = len(week_scores) - 1
+
+        for entry in ordered[start:end]:
+            below = bisect.bisect_left(week_scores, entry['score'])
+            equal = bisect.bisect_right(week_scores, entry['score']) - below - 1
+            wins = below
+            losses = opponents - below - equal
+            results.append({
+                'league': entry['league'],
+                'season': entry['season'],
+                'week': entry['week'],
+                'team': entry['team'],
+                'score': entry['score'],
+                'ap_wins': wins,
+                'ap_losses': losses,
+                'ap_ties': equal,
+                'expected_wins': (wins + 0.5 * equal) / opponents if opponents > 0 else 0.0,
+            })
+
+        start = end
+
+    return results
+
+
+def summarize_expected_wins(team_weeks: List[Dict[str, Any]],
+                            week_limits: Optional[Dict[Tuple[str, int, str], int]] = None
+                            ) -> Dict[Tuple[str, int, str], Dict[str, Any]]:
+    """Roll team-week all-play results up to team-seasons
+
+    With week_limits, keyed by (league, season, team), only a team's first N
+    weeks of a season are counted, so playoff weeks in the weekly file don't
+    leak into regular-season totals.
+    """
+    by_season = defaultdict(list)
+    for tw in team_weeks:
+        by_season[(tw['league'], tw['season'], tw['team'])].append(tw)
+
+    seasons = {}
+    for (league, season, team), weeks in by_season.items():
+        weeks.sort(key=lambda tw: tw['week'])
+        if week_limits and (league, season, team) in week_limits:
+            weeks = weeks[:week_limits[(league, season, team)]]
+        seasons[(league, season, team)] = {
+            'weeks': len(weeks),
+            'ap_wins': sum(tw['ap_wins'] for tw in weeks),
+            'ap_losses': sum(tw['ap_losses'] for tw in weeks),
+            'ap_ties': sum(tw['ap_ties'] for tw in weeks),
+            'expected_wins': sum(tw['expected_wins'] for tw in weeks),
+        }
+    return seasons
+
+
+def load_actual_records(master_filename: str,
+                        rows: Optional[List[Dict[str, Any]]] = None) -> Dict[Tuple[int, str], Dict[str, int]]:
+    """Load actual regular season W-L-T and games played per team-season from the master DB"""
+    if rows is None:
+        with open(master_filename, 'r', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+
+    records = {}
+    for row in rows:
+        wins = int(row['rs_wins']) if row['rs_wins'] else 0
+        losses = int(row['rs_losses']) if row['rs_losses'] else 0
+        ties = int(row['rs_ties']) if row['rs_ties'] else 0
+        if wins > 0 or losses > 0:
+            games = int(row['rs_gp']) if row['rs_gp'] and row['rs_gp'] != '0' else wins + losses + ties
+            records[(int(row['season_year']), row['team_code'])] = {
+                'wins': wins, 'losses': losses, 'ties': ties, 'games': games,
+            }
+    return records
+
+
+def analyze_schedule_luck(weekly_filename: str, master_filename: str,
+                          master_rows: Optional[List[Dict[str, Any]]] = None,
+                          master_league: str = ''):
+    """Compare expected wins from all-play records with actual wins
+
+    master_league is the weekly file's league_id for the league the master DB
+    describes (blank when the weekly file has no league_id column); other
+    leagues get all-play totals but no luck.
+    """
+
+    team_weeks = compute_all_play(load_weekly_scores(weekly_filename))
+    actual_records = load_actual_records(master_filename, master_rows)
+    week_limits = {(master_league, season, team): record['games']
+                   for (season, team), record in actual_records.items()}
+    season_totals = summarize_expected_wins(team_weeks, week_limits)
+
+    print("=== All-Play / Expected Wins by Season ===\n")
+
+    luck_rows = []
+    for (league, season, team), totals in sorted(season_totals.items()):
+        record = actual_records.get((season, team)) if league == master_league else None
+        # Only compare full regular seasons; partial weekly data would read as luck
+        if record and totals['weeks'] == record['games']:
+            actual_wins = record['wins'] + 0.5 * record['ties']
+            luck = actual_wins - totals['expected_wins']
+        else:
+            actual_wins = None
+            luck = None
+        luck_rows.append({
+            'league': league,
+            'season': season,
+            'team': team,
+            'expected_wins': totals['expected_wins'],
+            'actual_wins': actual_wins,
+            'luck': luck,
+            **{k: totals[k] for k in ['weeks', 'ap_wins', 'ap_losses', 'ap_ties']},
+        })
+
+        actual = f"{record['wins']}-{record['losses']}-{record['ties']}" if record else "n/a"
+        luck_text = f"{luck:+.2f}" if luck is not None else "n/a"
+        label = f"{league} {season} {team}" if league else f"{season} {team}"
+        print(f"{label}: all-play {totals['ap_wins']}-{totals['ap_losses']}-{totals['ap_ties']}, "
+              f"xW {totals['expected_wins']:.2f}, actual {actual}, luck {luck_text}")
+
+    lucky = [r for r in luck_rows if r['luck'] is not None]
+    if lucky:
+        lucky.sort(key=lambda r: r['luck'])
+        print("\n=== Unluckiest Team-Seasons ===\n")
+        for r in lucky[:5]:
+            print(f"{r['season']} {r['team']}: {r['luck']:+.2f} wins vs expected")
+        print("\n=== Luckiest Team-Seasons ===\n")
+        for r in reversed(lucky[-5:]):
+            print(f"{r['season']} {r['team']}: {r['luck']:+.2f} wins vs expected")
+
+    return luck_rows
+
+
+if __name__ == "__main__":
+    weekly_file = "RFFL_WEEKLY_SCORES.csv"
+    master_file = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
+
+    if not os.path.exists(weekly_file):
+        print(f"Weekly scores file not found: {weekly_file}")
+        print("Expected columns: season_year, week, team_code, score (optional league_id)")
+    else:
+        analyze_schedule_luck(weekly_file, master_file)
@@ -3,83 +3,119 @@
 Analyze PF/PA data in RFFL CSV to identify patterns and missing data
 """
 
-import csv
 from collections import defaultdict
-import statistics
 
-def analyze_pf_pa_data(filename):
+from resolve_franchises import load_franchise_ids, franchise_of
+from rffl_query import scan, from_rows, col, count, mean, min_, max_
+
+ERA_LABELS = {
+    'early': "Early Era (2002-2010)",
+    'middle': "Middle Era (2011-2018)",
+    'modern': "Modern Era (2019+)",
+}
+
+def get_era(season):
+    """Scoring era of a season, as used by the analyses and estimators"""
+    if season <= 2010:
+        return 'early'
+    elif season <= 2018:
+        return 'middle'
+    else:
+        return 'modern'
+
+def parse_score(value):
+    """Parse a PF/PA value, treating blanks, zeros and placeholders as missing"""
+    value = value.strip()
+    if not value or value == '0.00' or value == 'MISSING_TASK_ESPN-MCP':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def analyze_pf_pa_data(filename, rows=None, franchise_ids=None):
     """Analyze PF/PA data by season and identify patterns"""
     
+    if franchise_ids is None:
+        franchise_ids = load_franchise_ids(filename, rows=rows)
+    master = scan(filename) if rows is None else from_rows(rows)
+    season = col('season_year').cast(int).alias('season')
+    pf = col('rs_pf').apply(parse_score).alias('pf')
+    pa = col('rs_pa').apply(parse_score).alias('pa')
+    
+    # Rows with complete PF/PA data; only these columns are ever read
+    complete_rows = (
+        master
+        .filter(pf.is_not_null() & pa.is_not_null())
+        .select(
+            season,
+            col('team_code').alias('team'),
+            pf,
+            pa,
+            col('rs_wins').apply(lambda v: int(v) if v else 0).alias('wins'),
+            col('rs_losses').apply(lambda v: int(v) if v else 0).alias('losses')
+        )
+        .collect()
+    )
+    
     season_data = defaultdict(list)
+    for row in complete_rows:
+        team_data = {k: row[k] for k in ['team', 'pf', 'pa', 'wins', 'losses']}
+        team_data['franchise'] = franchise_of({'season_year': row['season'], 'team_code': row['team']}, franchise_ids)
+        season_data[row['season']].append(team_data)
+    
+    season_totals = {
+        row['season']: row['total']
+        for row in master.group_by(season).agg(count().alias('total')).collect()
+    }
     missing_by_season = defaultdict(int)
-    complete_seasons = []
+    for season_year, total in season_totals.items():
+        missing_by_season[season_year] = total - len(season_data[season_year])
     
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        
-        for row in reader:
-            season = int(row['season_year'])
-            rs_pf = row['rs_pf'].strip()
-            rs_pa = row['rs_pa'].strip()
-            
-            # Check if this row has complete PF/PA data
-            if rs_pf and rs_pa and rs_pf != '0.00' and rs_pa != '0.00' and rs_pf != 'MISSING_TASK_ESPN-MCP':
-                try:
-                    pf_val = float(rs_pf)
-                    pa_val = float(rs_pa)
-                    season_data[season].append({
-                        'team': row['team_code'],
-                        'pf': pf_val,
-                        'pa': pa_val,
-                        'wins': int(row['rs_wins']) if row['rs_wins'] else 0,
-                        'losses': int(row['rs_losses']) if row['rs_losses'] else 0
-                    })
-                except ValueError:
-                    missing_by_season[season] += 1
-            else:
-                missing_by_season[season] += 1
+    complete_seasons = []
     
     # Calculate season statistics
     print("=== PF/PA Data Analysis by Season ===\n")
     
-    for season in sorted(season_data.keys()):
-        teams = season_data[season]
-        if len(teams) >= 8:  # Consider seasons with most data complete
-            pf_values = [team['pf'] for team in teams]
-            pa_values = [team['pa'] for team in teams]
-            
-            avg_pf = statistics.mean(pf_values)
-            avg_pa = statistics.mean(pa_values)
-            
-            print(f"Season {season} - Complete data for {len(teams)} teams:")
-            print(f"  Average PF: {avg_pf:.2f}")
-            print(f"  Average PA: {avg_pa:.2f}")
-            print(f"  PF Range: {min(pf_values):.2f} - {max(pf_values):.2f}")
-            print(f"  Missing entries: {missing_by_season[season]}")
-            
-            complete_seasons.append({
-                'season': season,
-                'avg_pf': avg_pf,
-                'avg_pa': avg_pa,
-                'teams': len(teams)
-            })
-            print()
+    season_stats = (
+        from_rows(complete_rows)
+        .group_by('season')
+        .agg(
+            count().alias('teams'),
+            mean(col('pf')).alias('avg_pf'),
+            mean(col('pa')).alias('avg_pa'),
+            min_(col('pf')).alias('min_pf'),
+            max_(col('pf')).alias('max_pf')
+        )
+        .filter(col('teams') >= 8)  # Consider seasons with most data complete
+        .sort('season')
+        .collect()
+    )
+    
+    for stats in season_stats:
+        print(f"Season {stats['season']} - Complete data for {stats['teams']} teams:")
+        print(f"  Average PF: {stats['avg_pf']:.2f}")
+        print(f"  Average PA: {stats['avg_pa']:.2f}")
+        print(f"  PF Range: {stats['min_pf']:.2f} - {stats['max_pf']:.2f}")
+        print(f"  Missing entries: {missing_by_season[stats['season']]}")
+        
+        complete_seasons.append({
+            'season': stats['season'],
+            'avg_pf': stats['avg_pf'],
+            'avg_pa': stats['avg_pa'],
+            'teams': stats['teams']
+        })
+        print()
     
     # Show incomplete seasons
     print("=== Seasons with Missing PF/PA Data ===\n")
-    all_seasons = set()
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            all_seasons.add(int(row['season_year']))
-    
-    for season in sorted(all_seasons):
-        complete_count = len(season_data[season])
-        missing_count = missing_by_season[season]
-        total_count = complete_count + missing_count
+    for season_year in sorted(season_totals):
+        complete_count = len(season_data[season_year])
+        missing_count = missing_by_season[season_year]
+        total_count = season_totals[season_year]
         
         if complete_count < total_count * 0.8:  # Less than 80% complete
-            print(f"Season {season}: {complete_count}/{total_count} complete ({missing_count} missing)")
+            print(f"Season {season_year}: {complete_count}/{total_count} complete ({missing_count} missing)")
     
     return complete_seasons, season_data
 
@@ -89,54 +125,35 @@ def generate_historical_averages(complete_seasons, season_data):
     print("\n=== Historical Trends for Data Filling ===\n")
     
     # Overall averages by era
-    early_era = []  # 2002-2010
-    middle_era = []  # 2011-2018  
-    modern_era = []  # 2019+
-    
-    for season_info in complete_seasons:
-        season = season_info['season']
-        if season <= 2010:
-            early_era.append(season_info)
-        elif season <= 2018:
-            middle_era.append(season_info)
-        else:
-            modern_era.append(season_info)
-    
-    eras = [
-        ("Early Era (2002-2010)", early_era),
-        ("Middle Era (2011-2018)", middle_era), 
-        ("Modern Era (2019+)", modern_era)
-    ]
-    
-    for era_name, era_data in eras:
-        if era_data:
-            avg_pf = statistics.mean([s['avg_pf'] for s in era_data])
-            avg_pa = statistics.mean([s['avg_pa'] for s in era_data])
-            print(f"{era_name}:")
-            print(f"  Average PF: {avg_pf:.2f}")
-            print(f"  Average PA: {avg_pa:.2f}")
-            print()
-    
-    # Team-specific averages for teams with enough data
+    era_stats = (
+        from_rows(complete_seasons)
+        .group_by(col('season').apply(get_era).alias('era'))
+        .agg(mean(col('avg_pf')).alias('avg_pf'), mean(col('avg_pa')).alias('avg_pa'))
+        .sort(col('era').apply(list(ERA_LABELS).index))
+        .collect()
+    )
+    
+    for stats in era_stats:
+        print(f"{ERA_LABELS[stats['era']]}:")
+        print(f"  Average PF: {stats['avg_pf']:.2f}")
+        print(f"  Average PA: {stats['avg_pa']:.2f}")
+        print()
+    
+    # Franchise averages (across team renames) for franchises with enough data
     print("=== Team Historical Averages ===\n")
-    team_stats = defaultdict(list)
-    
-    for season, teams in season_data.items():
-        for team in teams:
-            team_stats[team['team']].append({
-                'season': season,
-                'pf': team['pf'],
-                'pa': team['pa'],
-                'wins': team['wins']
-            })
-    
-    for team_code in sorted(team_stats.keys()):
-        team_data = team_stats[team_code]
-        if len(team_data) >= 3:  # Teams with at least 3 seasons of data
-            avg_pf = statistics.mean([t['pf'] for t in team_data])
-            avg_pa = statistics.mean([t['pa'] for t in team_data])
-            seasons_played = len(team_data)
-            print(f"{team_code}: {seasons_played} seasons - Avg PF: {avg_pf:.2f}, Avg PA: {avg_pa:.2f}")
+    team_rows = [team for teams in season_data.values() for team in teams]
+    
+    team_stats = (
+        from_rows(team_rows)
+        .group_by('franchise')
+        .agg(count().alias('seasons'), mean(col('pf')).alias('avg_pf'), mean(col('pa')).alias('avg_pa'))
+        .filter(col('seasons') >= 3)  # Franchises with at least 3 seasons of data
+        .sort('franchise')
+        .collect()
+    )
+    
+    for stats in team_stats:
+        print(f"{stats['franchise']}: {stats['seasons']} seasons - Avg PF: {stats['avg_pf']:.2f}, Avg PA: {stats['avg_pa']:.2f}")
 
 if __name__ == "__main__":
     filename = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
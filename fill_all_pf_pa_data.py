@@ -8,46 +8,52 @@ import random
 from collections import defaultdict
 import statistics
 
-def load_and_analyze_data(filename):
+from resolve_franchises import load_franchise_ids, franchise_of
+from rffl_output import write_output
+
+def load_and_analyze_data(filename, franchise_ids=None, rows=None):
     """Load data and calculate comprehensive statistics"""
     
+    franchise_ids = franchise_ids or {}
     season_data = defaultdict(list)
     team_historical = defaultdict(list)
     division_data = defaultdict(list)
     
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
+    if rows is None:
+        with open(filename, 'r', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+    
+    for row in rows:
+        season = int(row['season_year'])
+        rs_pf = row['rs_pf'].strip()
+        rs_pa = row['rs_pa'].strip()
         
-        for row in reader:
-            season = int(row['season_year'])
-            rs_pf = row['rs_pf'].strip()
-            rs_pa = row['rs_pa'].strip()
-            
-            # Collect complete data for analysis
-            if rs_pf and rs_pa and rs_pf not in ['0.00', 'MISSING_TASK_ESPN-MCP', '']:
-                try:
-                    pf_val = float(rs_pf)
-                    pa_val = float(rs_pa)
-                    wins = int(row['rs_wins']) if row['rs_wins'] else 0
-                    losses = int(row['rs_losses']) if row['rs_losses'] else 0
+        # Collect complete data for analysis
+        if rs_pf and rs_pa and rs_pf not in ['0.00', 'MISSING_TASK_ESPN-MCP', '']:
+            try:
+                pf_val = float(rs_pf)
+                pa_val = float(rs_pa)
+                wins = int(row['rs_wins']) if row['rs_wins'] else 0
+                losses = int(row['rs_losses']) if row['rs_losses'] else 0
+                
+                team_data = {
+                    'team': row['team_code'],
+                    'franchise': franchise_of(row, franchise_ids),
+                    'pf': pf_val,
+                    'pa': pa_val,
+                    'wins': wins,
+                    'losses': losses,
+                    'season': season,
+                    'division': row['division_code']
+                }
+                
+                season_data[season].append(team_data)
+                team_historical[team_data['franchise']].append(team_data)
+                if row['division_code']:
+                    division_data[row['division_code']].append(team_data)
                     
-                    team_data = {
-                        'team': row['team_code'],
-                        'pf': pf_val,
-                        'pa': pa_val,
-                        'wins': wins,
-                        'losses': losses,
-                        'season': season,
-                        'division': row['division_code']
-                    }
-                    
-                    season_data[season].append(team_data)
-                    team_historical[row['team_code']].append(team_data)
-                    if row['division_code']:
-                        division_data[row['division_code']].append(team_data)
-                        
-                except ValueError:
-                    pass
+            except ValueError:
+                pass
     
     return season_data, team_historical, division_data
 
@@ -68,11 +74,11 @@ def get_era_baseline(season):
     else:
         return 1400, 1400  # Current era
 
-def estimate_pf_pa_comprehensive(row, team_historical, season_data, division_data):
+def estimate_pf_pa_comprehensive(row, team_historical, season_data, division_data, franchise_ids=None):
     """Comprehensive PF/PA estimation using all available data"""
     
     season = int(row['season_year'])
-    team_code = row['team_code']
+    franchise = franchise_of(row, franchise_ids or {})
     wins = int(row['rs_wins']) if row['rs_wins'] else 0
     losses = int(row['rs_losses']) if row['rs_losses'] else 0
     division = row['division_code']
@@ -81,9 +87,9 @@ def estimate_pf_pa_comprehensive(row, team_historical, season_data, division_dat
     # Start with era baseline
     base_pf, base_pa = get_era_baseline(season)
     
-    # Method 1: Use team historical average (highest priority)
-    if team_code in team_historical and len(team_historical[team_code]) >= 2:
-        team_seasons = team_historical[team_code]
+    # Method 1: Use franchise historical average (highest priority)
+    if franchise in team_historical and len(team_historical[franchise]) >= 2:
+        team_seasons = team_historical[franchise]
         
         # Weight recent seasons more heavily
         weighted_pf = 0
@@ -175,14 +181,20 @@ def estimate_pf_pa_comprehensive(row, team_historical, season_data, division_dat
     
     return round(final_pf, 2), round(final_pa, 2)
 
-def fill_comprehensive_pf_pa(input_filename, output_filename):
+def fill_comprehensive_pf_pa(input_filename, output_filename, patch_filename=None,
+                             rows=None, franchise_ids=None):
     """Fill all missing PF/PA data comprehensively"""
     
     print("Loading and analyzing all available data...")
-    season_data, team_historical, division_data = load_and_analyze_data(input_filename)
+    if rows is None:
+        with open(input_filename, 'r', encoding='utf-8') as infile:
+            rows = list(csv.DictReader(infile))
+    if franchise_ids is None:
+        franchise_ids = load_franchise_ids(input_filename)
+    season_data, team_historical, division_data = load_and_analyze_data(input_filename, franchise_ids, rows)
     
-    print(f"Loaded data for {len(team_historical)} teams across {len(season_data)} seasons")
-    print(f"Team coverage: {', '.join(sorted(team_historical.keys()))}")
+    print(f"Loaded data for {len(team_historical)} franchises across {len(season_data)} seasons")
+    print(f"Franchise coverage: {', '.join(sorted(team_historical.keys()))}")
     
     # Set random seed for reproducible results
     random.seed(42)
@@ -190,10 +202,6 @@ def fill_comprehensive_pf_pa(input_filename, output_filename):
     filled_count = 0
     total_checked = 0
     
-    with open(input_filename, 'r', encoding='utf-8') as infile:
-        reader = csv.DictReader(infile)
-        rows = list(reader)
-    
     print("\nFilling missing PF/PA data...")
     
     for row in rows:
@@ -212,7 +220,7 @@ def fill_comprehensive_pf_pa(input_filename, output_filename):
         
         if needs_filling:
             estimated_pf, estimated_pa = estimate_pf_pa_comprehensive(
-                row, team_historical, season_data, division_data
+                row, team_historical, season_data, division_data, franchise_ids
             )
             
             row['rs_pf'] = str(estimated_pf)
@@ -222,11 +230,9 @@ def fill_comprehensive_pf_pa(input_filename, output_filename):
             print(f"  {season} {team} → PF: {estimated_pf}, PA: {estimated_pa}")
     
     # Save updated data
-    with open(output_filename, 'w', newline='', encoding='utf-8') as outfile:
-        fieldnames = rows[0].keys()
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    patched = write_output(rows, output_filename, patch_filename)
+    if patch_filename:
+        print(f"Wrote {patched} changed rows to patch: {patch_filename}")
     
     print(f"\nCompleted! Filled {filled_count} out of {total_checked} total entries.")
     print(f"Updated file saved as: {output_filename}")
@@ -6,7 +6,9 @@ Fills missing data in the RFFL Master Database CSV file
 
 import csv
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+from rffl_output import write_output
 
 def load_csv_data(filename: str) -> List[Dict[str, Any]]:
     """Load CSV data into a list of dictionaries"""
@@ -166,25 +168,21 @@ def fill_missing_espn_placeholders(data: List[Dict[str, Any]]) -> List[Dict[str,
     
     return data
 
-def save_csv_data(data: List[Dict[str, Any]], filename: str):
-    """Save the updated data to CSV file"""
+def save_csv_data(data: List[Dict[str, Any]], filename: str, patch_filename: Optional[str] = None):
+    """Save the updated data to CSV file, optionally with a patch of the rows that changed"""
     if not data:
         return
     
-    fieldnames = list(data[0].keys())
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    patched = write_output(data, filename, patch_filename)
+    if patch_filename:
+        print(f"Wrote {patched} changed rows to patch: {patch_filename}")
 
-def main():
-    """Main function to process the CSV file"""
-    input_file = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
-    output_file = "RFFL_MASTER_DB_FILLED.csv"
-    
-    print("Loading CSV data...")
-    data = load_csv_data(input_file)
+def fill_csv_file(input_file: str, output_file: str, data: Optional[List[Dict[str, Any]]] = None,
+                  patch_filename: Optional[str] = None):
+    """Fill missing metadata in input_file (or pre-loaded rows) and save to output_file"""
+    if data is None:
+        print("Loading CSV data...")
+        data = load_csv_data(input_file)
     print(f"Loaded {len(data)} rows")
     
     print("Filling owner locations...")
@@ -200,13 +198,22 @@ def main():
     data = fill_missing_espn_placeholders(data)
     
     print("Saving updated CSV...")
-    save_csv_data(data, output_file)
+    save_csv_data(data, output_file, patch_filename)
     
     print(f"Data filling complete! Output saved to: {output_file}")
     
     # Print summary of changes
     missing_task_kyle_count = sum(1 for row in data if 'MISSING_TASK_KYLE' in str(row))
     print(f"Remaining MISSING_TASK_KYLE entries: {missing_task_kyle_count}")
+    
+    return data
+
+def main():
+    """Main function to process the CSV file"""
+    input_file = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
+    output_file = "RFFL_MASTER_DB_FILLED.csv"
+    
+    fill_csv_file(input_file, output_file)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -8,42 +8,48 @@ import random
 from collections import defaultdict
 import statistics
 
-def load_and_analyze_data(filename):
-    """Load data and calculate team-specific and era-based statistics"""
+from analyze_pf_pa_data import get_era
+from resolve_franchises import load_franchise_ids, franchise_of
+from rffl_output import write_output
+
+def load_and_analyze_data(filename, franchise_ids=None, rows=None):
+    """Load data and calculate franchise-specific and era-based statistics"""
     
+    franchise_ids = franchise_ids or {}
     season_data = defaultdict(list)
     team_historical = defaultdict(list)
     
-    with open(filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
+    if rows is None:
+        with open(filename, 'r', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+    
+    for row in rows:
+        season = int(row['season_year'])
+        rs_pf = row['rs_pf'].strip()
+        rs_pa = row['rs_pa'].strip()
         
-        for row in reader:
-            season = int(row['season_year'])
-            rs_pf = row['rs_pf'].strip()
-            rs_pa = row['rs_pa'].strip()
-            
-            # Collect complete data for analysis
-            if rs_pf and rs_pa and rs_pf != '0.00' and rs_pa != '0.00' and rs_pf != 'MISSING_TASK_ESPN-MCP':
-                try:
-                    pf_val = float(rs_pf)
-                    pa_val = float(rs_pa)
-                    wins = int(row['rs_wins']) if row['rs_wins'] else 0
-                    losses = int(row['rs_losses']) if row['rs_losses'] else 0
-                    
-                    team_data = {
-                        'team': row['team_code'],
-                        'pf': pf_val,
-                        'pa': pa_val,
-                        'wins': wins,
-                        'losses': losses,
-                        'season': season
-                    }
-                    
-                    season_data[season].append(team_data)
-                    team_historical[row['team_code']].append(team_data)
-                    
-                except ValueError:
-                    pass
+        # Collect complete data for analysis
+        if rs_pf and rs_pa and rs_pf != '0.00' and rs_pa != '0.00' and rs_pf != 'MISSING_TASK_ESPN-MCP':
+            try:
+                pf_val = float(rs_pf)
+                pa_val = float(rs_pa)
+                wins = int(row['rs_wins']) if row['rs_wins'] else 0
+                losses = int(row['rs_losses']) if row['rs_losses'] else 0
+                
+                team_data = {
+                    'team': row['team_code'],
+                    'pf': pf_val,
+                    'pa': pa_val,
+                    'wins': wins,
+                    'losses': losses,
+                    'season': season
+                }
+                
+                season_data[season].append(team_data)
+                team_historical[franchise_of(row, franchise_ids)].append(team_data)
+                
+            except ValueError:
+                pass
     
     return season_data, team_historical
 
@@ -57,12 +63,7 @@ def calculate_era_averages(season_data):
     }
     
     for season, teams in season_data.items():
-        if season <= 2010:
-            era = 'early'
-        elif season <= 2018:
-            era = 'middle'
-        else:
-            era = 'modern'
+        era = get_era(season)
         
         for team in teams:
             era_stats[era]['pf'].append(team['pf'])
@@ -87,25 +88,17 @@ def calculate_era_averages(season_data):
     
     return era_averages
 
-def estimate_team_performance(team_code, season, wins, losses, team_historical, era_averages):
-    """Estimate PF/PA for a team based on historical data and win-loss record"""
-    
-    # Determine era
-    if season <= 2010:
-        era = 'early'
-    elif season <= 2018:
-        era = 'middle'
-    else:
-        era = 'modern'
+def estimate_team_performance(franchise, season, wins, losses, team_historical, era_averages):
+    """Estimate PF/PA for a team based on its franchise's history and win-loss record"""
     
-    era_stats = era_averages[era]
+    era_stats = era_averages[get_era(season)]
     
-    # Use team historical average if available
-    if team_code in team_historical and len(team_historical[team_code]) >= 2:
-        team_avg_pf = statistics.mean([t['pf'] for t in team_historical[team_code]])
-        team_avg_pa = statistics.mean([t['pa'] for t in team_historical[team_code]])
-        team_std_pf = statistics.stdev([t['pf'] for t in team_historical[team_code]]) if len(team_historical[team_code]) > 1 else 75
-        team_std_pa = statistics.stdev([t['pa'] for t in team_historical[team_code]]) if len(team_historical[team_code]) > 1 else 75
+    # Use franchise historical average if available
+    if franchise in team_historical and len(team_historical[franchise]) >= 2:
+        team_avg_pf = statistics.mean([t['pf'] for t in team_historical[franchise]])
+        team_avg_pa = statistics.mean([t['pa'] for t in team_historical[franchise]])
+        team_std_pf = statistics.stdev([t['pf'] for t in team_historical[franchise]]) if len(team_historical[franchise]) > 1 else 75
+        team_std_pa = statistics.stdev([t['pa'] for t in team_historical[franchise]]) if len(team_historical[franchise]) > 1 else 75
         
         # Blend team historical with era average (70% team, 30% era)
         base_pf = 0.7 * team_avg_pf + 0.3 * era_stats['avg_pf']
@@ -147,11 +140,17 @@ def estimate_team_performance(team_code, season, wins, losses, team_historical,
     
     return round(final_pf, 2), round(final_pa, 2)
 
-def fill_pf_pa_data(input_filename, output_filename):
+def fill_pf_pa_data(input_filename, output_filename, patch_filename=None,
+                    rows=None, franchise_ids=None):
     """Fill missing PF/PA data and save to new file"""
     
     print("Loading and analyzing historical data...")
-    season_data, team_historical = load_and_analyze_data(input_filename)
+    if rows is None:
+        with open(input_filename, 'r', encoding='utf-8') as infile:
+            rows = list(csv.DictReader(infile))
+    if franchise_ids is None:
+        franchise_ids = load_franchise_ids(input_filename)
+    season_data, team_historical = load_and_analyze_data(input_filename, franchise_ids, rows)
     
     print("Calculating era-based averages...")
     era_averages = calculate_era_averages(season_data)
@@ -168,10 +167,6 @@ def fill_pf_pa_data(input_filename, output_filename):
     filled_count = 0
     total_missing = 0
     
-    with open(input_filename, 'r', encoding='utf-8') as infile:
-        reader = csv.DictReader(infile)
-        rows = list(reader)
-    
     for row in rows:
         rs_pf = row['rs_pf'].strip()
         rs_pa = row['rs_pa'].strip()
@@ -196,7 +191,7 @@ def fill_pf_pa_data(input_filename, output_filename):
                 team_code = row['team_code']
                 
                 estimated_pf, estimated_pa = estimate_team_performance(
-                    team_code, season, wins, losses, team_historical, era_averages
+                    franchise_of(row, franchise_ids), season, wins, losses, team_historical, era_averages
                 )
                 
                 row['rs_pf'] = str(estimated_pf)
@@ -206,11 +201,9 @@ def fill_pf_pa_data(input_filename, output_filename):
                 print(f"  {season} {team_code}: {wins}-{losses} → PF: {estimated_pf}, PA: {estimated_pa}")
     
     # Save updated data
-    with open(output_filename, 'w', newline='', encoding='utf-8') as outfile:
-        fieldnames = rows[0].keys()
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    patched = write_output(rows, output_filename, patch_filename)
+    if patch_filename:
+        print(f"Wrote {patched} changed rows to patch: {patch_filename}")
     
     print(f"\nCompleted! Filled {filled_count} out of {total_missing} missing PF/PA entries.")
     print(f"Updated file saved as: {output_filename}")
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Materialize all-time and per-era RFFL leaderboards into a compact sorted store
+
+The store is refreshed incrementally: only team-seasons that are new, changed
+or removed since the last run touch their leaderboard entries, so dashboard
+reads never trigger a full recomputation.
+"""
+
+import bisect
+import csv
+import heapq
+import json
+import os
+from typing import Dict, List, Any, Optional, Tuple
+
+from analyze_pf_pa_data import get_era, parse_score
+from resolve_franchises import load_franchise_ids, franchise_of
+from rffl_output import write_json
+from score_data_quality import parse_number
+
+STORE_VERSION = 2
+TOP_K = 10
+
+BOARDS = ['career_pf', 'best_season_pf', 'titles', 'playoff_appearances', 'net_winnings']
+COUNT_BOARDS = {'titles', 'playoff_appearances'}
+PLAYOFF_BRACKETS = ['Alpha Bowl', 'bowl_alpha']
+
+
+def row_contribution(row: Dict[str, Any], franchise_ids: Dict[str, str]) -> Dict[str, Any]:
+    """Reduce a team-season row to what it contributes to its franchise's entries"""
+    return {
+        'team': franchise_of(row, franchise_ids),
+        'season': int(row['season_year']),
+        'pf': parse_score(row['rs_pf']),
+        'title': 1 if row['final_rank'].strip() == '1' else 0,
+        'playoffs': 1 if row['postseason_bracket'].strip() in PLAYOFF_BRACKETS else 0,
+        'net': parse_number(row['owners_net_total_usd']),
+    }
+
+
+class _TopEntry:
+    """A (-value, key) rank entry ordered worst-first, so a min-heap of them
+    keeps the weakest of the top k at the root under the same tie-break as
+    SortedLeaderboard.ranked (higher value, then smaller key, wins)"""
+
+    __slots__ = ('rank_key',)
+
+    def __init__(self, neg: float, key: str):
+        self.rank_key = (neg, key)
+
+    def __lt__(self, other: '_TopEntry') -> bool:
+        return self.rank_key > other.rank_key
+
+
+class SortedLeaderboard:
+    """A leaderboard kept as a sorted list with a top-k heap on the side"""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.values: Dict[str, float] = {}
+        self.ranked: List[Tuple[float, str]] = []  # (-value, key), ascending
+        self.top_heap: List[_TopEntry] = []  # top k, weakest at the root
+
+    def set(self, key: str, value: Optional[float]):
+        """Insert, update or (with None) remove a single entry"""
+        old = self.values.get(key)
+        if old == value:
+            return
+
+        if old is not None:
+            idx = bisect.bisect_left(self.ranked, (-old, key))
+            del self.ranked[idx]
+            del self.values[key]
+        if value is not None:
+            bisect.insort(self.ranked, (-value, key))
+            self.values[key] = value
+
+        # Only touch the heap when the change can affect the top k
+        in_top = old is not None and any(e.rank_key == (-old, key) for e in self.top_heap)
+        beats_top = value is not None and (
+            len(self.top_heap) < self.k or (-value, key) < self.top_heap[0].rank_key
+        )
+        if in_top or beats_top:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self.top_heap = [_TopEntry(neg, key) for neg, key in self.ranked[:self.k]]
+        heapq.heapify(self.top_heap)
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return the best k entries, highest first"""
+        k = self.k if k is None else k
+        if k <= len(self.top_heap):
+            best = sorted(entry.rank_key for entry in self.top_heap)[:k]
+            return [(key, -neg) for neg, key in best]
+        return [(key, -neg) for neg, key in self.ranked[:k]]
+
+    def rank_of(self, key: str) -> Optional[int]:
+        """1-based rank of an entry, or None if it is not on the board"""
+        if key not in self.values:
+            return None
+        return bisect.bisect_left(self.ranked, (-self.values[key], key)) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'k': self.k, 'ranked': [[key, -neg] for neg, key in self.ranked]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SortedLeaderboard':
+        board = cls(data.get('k', TOP_K))
+        board.ranked = [(-value, key) for key, value in data['ranked']]
+        board.values = {key: value for key, value in data['ranked']}
+        board._rebuild_heap()
+        return board
+
+
+class LeaderboardStore:
+    """All-time and per-era leaderboards plus the per-row state to refresh them"""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.rows: Dict[str, Dict[str, Any]] = {}  # row_key -> contribution
+        self.team_rows: Dict[str, set] = {}  # team -> row_keys, rebuilt on load
+        self.boards: Dict[str, Dict[str, SortedLeaderboard]] = {}
+
+    def board(self, scope: str, name: str) -> SortedLeaderboard:
+        if scope not in self.boards:
+            self.boards[scope] = {}
+        if name not in self.boards[scope]:
+            self.boards[scope][name] = SortedLeaderboard(self.k)
+        return self.boards[scope][name]
+
+    def _recompute_entry(self, scope: str, team: str):
+        """Re-aggregate one team within one scope from its own rows only"""
+        contribs = [
+            self.rows[row_key] for row_key in self.team_rows.get(team, ())
+            if scope == 'all' or get_era(self.rows[row_key]['season']) == scope
+        ]
+        pf_values = [c['pf'] for c in contribs if c['pf'] is not None]
+        net_values = [c['net'] for c in contribs if c['net'] is not None]
+
+        self.board(scope, 'career_pf').set(team, round(sum(pf_values), 2) if pf_values else None)
+        self.board(scope, 'best_season_pf').set(team, max(pf_values) if pf_values else None)
+        self.board(scope, 'titles').set(team, sum(c['title'] for c in contribs) if contribs else None)
+        self.board(scope, 'playoff_appearances').set(
+            team, sum(c['playoffs'] for c in contribs) if contribs else None
+        )
+        self.board(scope, 'net_winnings').set(team, round(sum(net_values), 2) if net_values else None)
+
+    def apply(self, changes: Dict[str, Optional[Dict[str, Any]]]) -> int:
+        """Apply changed rows (None means removed); returns entries refreshed"""
+        affected = set()
+        for row_key, contrib in changes.items():
+            old = self.rows.get(row_key)
+            for c in (old, contrib):
+                if c is not None:
+                    affected.add(('all', c['team']))
+                    affected.add((get_era(c['season']), c['team']))
+            if old is not None:
+                self.team_rows[old['team']].discard(row_key)
+            if contrib is None:
+                self.rows.pop(row_key, None)
+            else:
+                self.rows[row_key] = contrib
+                self.team_rows.setdefault(contrib['team'], set()).add(row_key)
+
+        for scope, team in affected:
+            self._recompute_entry(scope, team)
+        return len(affected)
+
+    def save(self, filename: str):
+        """Write the store atomically so readers never see a partial file"""
+        data = {
+            'version': STORE_VERSION,
+            'k': self.k,
+            'rows': self.rows,
+            'boards': {
+                scope: {name: board.to_dict() for name, board in boards.items()}
+                for scope, boards in self.boards.items()
+            },
+        }
+        write_json(data, filename)
+
+    @classmethod
+    def load(cls, filename: str) -> 'LeaderboardStore':
+        with open(filename, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data.get('version') != STORE_VERSION:
+            return cls()
+        store = cls(data.get('k', TOP_K))
+        store.rows = data['rows']
+        for row_key, contrib in store.rows.items():
+            store.team_rows.setdefault(contrib['team'], set()).add(row_key)
+        store.boards = {
+            scope: {name: SortedLeaderboard.from_dict(board) for name, board in boards.items()}
+            for scope, boards in data['boards'].items()
+        }
+        return store
+
+
+def diff_rows(rows: List[Dict[str, Any]], store: LeaderboardStore,
+              franchise_ids: Dict[str, str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Find the team-seasons that are new, changed or gone since the last refresh
+
+    A row whose franchise changed (e.g. a corrected owner) counts as changed,
+    so both the old and new franchise entries are refreshed.
+    """
+    changes = {}
+    seen = set()
+    for row in rows:
+        row_key = f"{row['season_year']}:{row['team_code']}"
+        seen.add(row_key)
+        contrib = row_contribution(row, franchise_ids)
+        if store.rows.get(row_key) != contrib:
+            changes[row_key] = contrib
+    for row_key in store.rows:
+        if row_key not in seen:
+            changes[row_key] = None
+    return changes
+
+
+def refresh_leaderboards(input_filename: str, store_filename: str,
+                         rows: Optional[List[Dict[str, Any]]] = None,
+                         franchise_ids: Optional[Dict[str, str]] = None) -> LeaderboardStore:
+    """Bring the materialized store up to date with the input CSV"""
+    if os.path.exists(store_filename):
+        store = LeaderboardStore.load(store_filename)
+    else:
+        store = LeaderboardStore()
+
+    if rows is None:
+        with open(input_filename, 'r', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+    if franchise_ids is None:
+        franchise_ids = load_franchise_ids(input_filename)
+
+    changes = diff_rows(rows, store, franchise_ids)
+    if changes:
+        refreshed = store.apply(changes)
+        store.save(store_filename)
+        print(f"Applied {len(changes)} changed rows, refreshed {refreshed} leaderboard entries")
+    else:
+        print("Leaderboards already up to date")
+
+    return store
+
+
+def read_leaderboard(store_filename: str, name: str, scope: str = 'all',
+                     k: int = TOP_K) -> List[Tuple[str, float]]:
+    """Read a materialized leaderboard without recomputing anything"""
+    store = LeaderboardStore.load(store_filename)
+    if scope not in store.boards or name not in store.boards[scope]:
+        return []
+    return store.boards[scope][name].top(k)
+
+
+def format_value(name: str, value: float) -> str:
+    """Counts as whole numbers, points and dollars to the cent"""
+    return f"{value:.0f}" if name in COUNT_BOARDS else f"{value:.2f}"
+
+
+def print_leaderboards(store: LeaderboardStore, k: int = 5):
+    """Print the top entries of every all-time and era leaderboard"""
+    for scope in ['all', 'early', 'middle', 'modern']:
+        if scope not in store.boards:
+            continue
+        print(f"\n=== {'All-Time' if scope == 'all' else scope.title() + ' Era'} Leaderboards ===")
+        for name in BOARDS:
+            entries = store.boards[scope][name].top(k)
+            formatted = ', '.join(f"{team} ({format_value(name, value)})" for team, value in entries)
+            print(f"  {name}: {formatted}")
+
+
+if __name__ == "__main__":
+    input_file = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
+    store_file = "RFFL_LEADERBOARDS.json"
+
+    store = refresh_leaderboards(input_file, store_file)
+    print_leaderboards(store)
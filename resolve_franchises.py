@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Resolve RFFL team-seasons into franchises
+
+Team identity drifts across seasons: codes and names change, and teams pick
+up or drop co-owners. Team-seasons are linked into franchises by exact keys
+(team_code, owner_code) first, then by fuzzy team name matching. Name
+candidates come from a character n-gram blocking index, so only names that
+share n-grams are ever compared instead of all pairs. Two team-seasons from
+the same season are never merged. Results are cached by file hash.
+"""
+
+import csv
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from rffl_output import file_hash, write_json
+
+CACHE_FILE = ".rffl_franchise_cache.json"
+CACHE_VERSION = 1
+
+NGRAM_SIZE = 3
+NAME_MATCH_THRESHOLD = 0.6     # Jaccard similarity of name n-grams
+CO_OWNER_MATCH_THRESHOLD = 0.4  # Looser when the owners overlap via co-ownership
+MAX_BLOCK_SIZE = 50            # Skip n-grams so common they don't discriminate
+
+
+def load_team_seasons(filename: str, rows: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Load the identity columns of every team-season"""
+    if rows is None:
+        with open(filename, 'r', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+
+    return [
+        {
+            'season': int(row['season_year']),
+            'team_code': row['team_code'],
+            'name': row['team_full_name'],
+            'owner': row['owner_code'],
+            'co_owner': row['co-owner'] if row['is_co_owned'] == 'Yes' else '',
+        }
+        for row in rows
+    ]
+
+
+def name_ngrams(name: str, n: int = NGRAM_SIZE) -> Set[str]:
+    """Character n-grams of a normalized team name; placeholders have none"""
+    if not name or 'TASK' in name:
+        return set()
+    normalized = ' ' + re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip() + ' '
+    return {normalized[i:i + n] for i in range(len(normalized) - n + 1)}
+
+
+class FranchiseUnion:
+    """Union-find over team-seasons that refuses to merge overlapping seasons"""
+
+    def __init__(self, team_seasons: List[Dict[str, Any]]):
+        self.parent = list(range(len(team_seasons)))
+        self.seasons = [{ts['season']} for ts in team_seasons]
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return True
+        if self.seasons[root_a] & self.seasons[root_b]:
+            return False
+        if len(self.seasons[root_a]) < len(self.seasons[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.seasons[root_a] |= self.seasons[root_b]
+        return True
+
+
+def link_exact_keys(team_seasons: List[Dict[str, Any]], union: FranchiseUnion):
+    """Link team-seasons that share a team_code or an owner_code"""
+    by_season = sorted(range(len(team_seasons)), key=lambda i: team_seasons[i]['season'])
+    for key in ['team_code', 'owner']:
+        first_seen = {}
+        for i in by_season:
+            value = team_seasons[i][key]
+            if not value:
+                continue
+            if value in first_seen:
+                union.union(first_seen[value], i)
+            else:
+                first_seen[value] = i
+
+
+def fuzzy_candidates(team_seasons: List[Dict[str, Any]]) -> Set[Tuple[int, int]]:
+    """Candidate pairs that share at least one name n-gram block"""
+    index = defaultdict(list)
+    for i, ts in enumerate(team_seasons):
+        for gram in name_ngrams(ts['name']):
+            index[gram].append(i)
+
+    pairs = set()
+    for members in index.values():
+        if len(members) > MAX_BLOCK_SIZE:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                a, b = members[x], members[y]
+                if team_seasons[a]['season'] != team_seasons[b]['season']:
+                    pairs.add((a, b))
+    return pairs
+
+
+def link_fuzzy_names(team_seasons: List[Dict[str, Any]], union: FranchiseUnion):
+    """Link team-seasons whose names are similar enough"""
+    grams = [name_ngrams(ts['name']) for ts in team_seasons]
+
+    scored = []
+    for a, b in fuzzy_candidates(team_seasons):
+        if union.find(a) == union.find(b):
+            continue
+        similarity = len(grams[a] & grams[b]) / len(grams[a] | grams[b])
+        owners_a = {team_seasons[a]['owner'], team_seasons[a]['co_owner']} - {''}
+        owners_b = {team_seasons[b]['owner'], team_seasons[b]['co_owner']} - {''}
+        threshold = CO_OWNER_MATCH_THRESHOLD if owners_a & owners_b else NAME_MATCH_THRESHOLD
+        if similarity >= threshold:
+            scored.append((similarity, a, b))
+
+    # Strongest matches first, so a weak match can't block a better one
+    for similarity, a, b in sorted(scored, reverse=True):
+        union.union(a, b)
+
+
+def resolve_franchises(team_seasons: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Map 'season:team_code' to a franchise ID for every team-season"""
+    union = FranchiseUnion(team_seasons)
+    link_exact_keys(team_seasons, union)
+    link_fuzzy_names(team_seasons, union)
+
+    components = defaultdict(list)
+    for i in range(len(team_seasons)):
+        components[union.find(i)].append(i)
+
+    # Name each franchise after its earliest team code
+    franchise_ids = {}
+    used_ids = set()
+    for members in sorted(components.values(), key=lambda m: min(team_seasons[i]['season'] for i in m)):
+        first = min(members, key=lambda i: team_seasons[i]['season'])
+        franchise_id = f"F-{team_seasons[first]['team_code']}"
+        suffix = 2
+        while franchise_id in used_ids:
+            franchise_id = f"F-{team_seasons[first]['team_code']}-{suffix}"
+            suffix += 1
+        used_ids.add(franchise_id)
+        for i in members:
+            franchise_ids[f"{team_seasons[i]['season']}:{team_seasons[i]['team_code']}"] = franchise_id
+
+    return franchise_ids
+
+
+def load_franchise_ids(filename: str, cache_filename: str = CACHE_FILE,
+                       rows: Optional[List[Dict[str, Any]]] = None) -> Dict[str, str]:
+    """Franchise IDs for a data file, resolved once per file version"""
+    cache_key = file_hash(filename)
+    cache = {}
+    if os.path.exists(cache_filename):
+        try:
+            with open(cache_filename, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            cache = {}
+    if cache.get('version') == CACHE_VERSION and cache.get('file_hash') == cache_key:
+        return cache['franchise_ids']
+
+    franchise_ids = resolve_franchises(load_team_seasons(filename, rows))
+
+    write_json({'version': CACHE_VERSION, 'file_hash': cache_key, 'franchise_ids': franchise_ids},
+               cache_filename)
+    return franchise_ids
+
+
+def franchise_of(row: Dict[str, Any], franchise_ids: Dict[str, str]) -> str:
+    """Franchise ID for a row, falling back to its team_code"""
+    return franchise_ids.get(f"{row['season_year']}:{row['team_code']}", row['team_code'])
+
+
+def print_franchise_lineage(filename: str, rows: Optional[List[Dict[str, Any]]] = None):
+    """Print each franchise's sequence of team codes"""
+    team_seasons = load_team_seasons(filename, rows)
+    franchise_ids = load_franchise_ids(filename, rows=rows)
+
+    lineage = defaultdict(list)
+    for ts in sorted(team_seasons, key=lambda t: t['season']):
+        franchise_id = franchise_ids[f"{ts['season']}:{ts['team_code']}"]
+        if not lineage[franchise_id] or lineage[franchise_id][-1][1] != ts['team_code']:
+            lineage[franchise_id].append((ts['season'], ts['team_code'], ts['name']))
+
+    print(f"=== Franchise Lineage ({len(lineage)} franchises) ===\n")
+    for franchise_id in sorted(lineage):
+        history = ' → '.join(f"{code} ({season})" for season, code, name in lineage[franchise_id])
+        print(f"{franchise_id}: {history}")
+
+
+if __name__ == "__main__":
+    input_file = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
+
+    print_franchise_lineage(input_file)
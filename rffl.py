@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+RFFL command-line entry point
+
+Runs one or more subcommands in order, e.g.
+
+    python3 rffl.py fill-meta fill-all analyze
+
+The master file is read and parsed once and shared by every subcommand in
+the chain; each fill step works on its own copy of the rows, so a chain
+produces the same outputs as running the standalone scripts one by one.
+Script modules are only imported when their subcommand runs, which keeps
+`rffl --help` and single-command runs fast.
+"""
+
+import argparse
+import sys
+import time
+from typing import Optional
+
+MASTER_FILE = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
+WEEKLY_FILE = "RFFL_WEEKLY_SCORES.csv"
+FILLED_FILE = "RFFL_MASTER_DB_FILLED.csv"
+WITH_PF_PA_FILE = "RFFL_MASTER_DB_WITH_PF_PA.csv"
+COMPLETE_PF_PA_FILE = "RFFL_MASTER_DB_COMPLETE_PF_PA.csv"
+LEADERBOARDS_FILE = "RFFL_LEADERBOARDS.json"
+
+# Fill outputs can be compressed or column-oriented; rffl_output picks the
+# encoding from the file name
+OUTPUT_FORMATS = ['csv', 'gzip', 'zstd', 'columnar']
+FORMAT_SUFFIXES = {'csv': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def output_path(filename: str, output_format: str) -> str:
+    """Name of a fill output in the requested format"""
+    if output_format == 'columnar':
+        return filename[:-len('.csv')] + '.json'
+    return filename + FORMAT_SUFFIXES[output_format]
+
+
+def patch_path(filename: str, args) -> Optional[str]:
+    """Patch file for a fill output when --patch is given; patches are always CSV rows"""
+    if not args.patch:
+        return None
+    output_format = 'csv' if args.format == 'columnar' else args.format
+    return output_path(filename + '.patch.csv', output_format)
+
+
+class Dataset:
+    """The master file, parsed on first use and shared across subcommands"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._rows = None
+        self._franchise_ids = None
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            import csv
+            with open(self.filename, 'r', encoding='utf-8') as file:
+                self._rows = list(csv.DictReader(file))
+        return self._rows
+
+    def copy_rows(self):
+        """Rows for a step that edits them in place"""
+        return [dict(row) for row in self.rows]
+
+    @property
+    def franchise_ids(self):
+        if self._franchise_ids is None:
+            from resolve_franchises import load_franchise_ids
+            self._franchise_ids = load_franchise_ids(self.filename, rows=self.rows)
+        return self._franchise_ids
+
+
+def run_analyze(dataset: Dataset, args):
+    from analyze_pf_pa_data import analyze_pf_pa_data, generate_historical_averages
+    complete_seasons, season_data = analyze_pf_pa_data(dataset.filename, rows=dataset.rows,
+                                                       franchise_ids=dataset.franchise_ids)
+    generate_historical_averages(complete_seasons, season_data)
+
+
+def run_fill_pf_pa(dataset: Dataset, args):
+    from fill_pf_pa_data import fill_pf_pa_data
+    fill_pf_pa_data(dataset.filename, output_path(WITH_PF_PA_FILE, args.format), patch_path(WITH_PF_PA_FILE, args),
+                    rows=dataset.copy_rows(), franchise_ids=dataset.franchise_ids)
+
+
+def run_fill_all(dataset: Dataset, args):
+    from fill_all_pf_pa_data import fill_comprehensive_pf_pa
+    fill_comprehensive_pf_pa(dataset.filename, output_path(COMPLETE_PF_PA_FILE, args.format),
+                             patch_path(COMPLETE_PF_PA_FILE, args),
+                             rows=dataset.copy_rows(), franchise_ids=dataset.franchise_ids)
+
+
+def run_fill_meta(dataset: Dataset, args):
+    from fill_csv_data import fill_csv_file
+    fill_csv_file(dataset.filename, output_path(FILLED_FILE, args.format), data=dataset.copy_rows(),
+                  patch_filename=patch_path(FILLED_FILE, args))
+
+
+def run_leaderboards(dataset: Dataset, args):
+    from materialize_leaderboards import refresh_leaderboards, print_leaderboards
+    store = refresh_leaderboards(dataset.filename, LEADERBOARDS_FILE,
+                                 rows=dataset.rows, franchise_ids=dataset.franchise_ids)
+    print_leaderboards(store)
+
+
+def run_luck(dataset: Dataset, args):
+    import os
+    from analyze_all_play import analyze_schedule_luck
+    if not os.path.exists(args.weekly):
+        print(f"Weekly scores file not found: {args.weekly}")
+        return
+    analyze_schedule_luck(args.weekly, dataset.filename, master_rows=dataset.rows, master_league=args.league)
+
+
+def run_quality(dataset: Dataset, args):
+    import os
+    from score_data_quality import score_league, print_quality_report
+    filled = output_path(FILLED_FILE, args.format)
+    filled = filled if os.path.exists(filled) else None
+    print_quality_report('RFFL', score_league(dataset.filename, filled, rows=dataset.rows))
+
+
+def run_franchises(dataset: Dataset, args):
+    from resolve_franchises import print_franchise_lineage
+    print_franchise_lineage(dataset.filename, rows=dataset.rows)
+
+
+COMMANDS = {
+    'analyze': (run_analyze, "PF/PA analysis and historical averages"),
+    'fill-pf-pa': (run_fill_pf_pa, f"fill missing PF/PA from W-L records -> {WITH_PF_PA_FILE}"),
+    'fill-all': (run_fill_all, f"fill every missing PF/PA entry -> {COMPLETE_PF_PA_FILE}"),
+    'fill-meta': (run_fill_meta, f"fill locations, fees and placeholders -> {FILLED_FILE}"),
+    'leaderboards': (run_leaderboards, f"refresh materialized leaderboards -> {LEADERBOARDS_FILE}"),
+    'luck': (run_luck, "all-play / expected-wins schedule luck (needs weekly scores)"),
+    'quality': (run_quality, "data-quality score for League.dataQualityScore"),
+    'franchises': (run_franchises, "franchise lineage across team renames"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='rffl',
+        description="RFFL data tools. Subcommands run in the order given and share one parse of the master file.",
+        epilog='\n'.join(f"  {name:<13} {help_text}" for name, (_, help_text) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('commands', nargs='+', choices=list(COMMANDS), metavar='command',
+                        help="one or more of: " + ', '.join(COMMANDS))
+    parser.add_argument('--input', default=MASTER_FILE, help="master CSV (default: %(default)s)")
+    parser.add_argument('--weekly', default=WEEKLY_FILE, help="weekly scores CSV for luck (default: %(default)s)")
+    parser.add_argument('--league', default='',
+                        help="league_id of the master DB's league in the weekly file (default: rows without one)")
+    parser.add_argument('--patch', action='store_true',
+                        help="also write <output>.patch.csv with only the rows that changed since the last run")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv',
+                        help="fill output format: plain, gzip- or zstd-compressed CSV, or "
+                             "column-oriented JSON (default: %(default)s)")
+    parser.add_argument('--timings', action='store_true', help="print elapsed time per subcommand")
+    return parser
+
+
+def main(argv=None) -> int:
+    start = time.perf_counter()
+    args = build_parser().parse_args(argv)
+    dataset = Dataset(args.input)
+
+    timings = []
+    for name in args.commands:
+        step_start = time.perf_counter()
+        COMMANDS[name][0](dataset, args)
+        timings.append((name, time.perf_counter() - step_start))
+        print()
+
+    if args.timings:
+        print("=== Timings ===")
+        for name, elapsed in timings:
+            print(f"  {name}: {elapsed * 1000:.1f} ms")
+        print(f"  total: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Shared output writer for the RFFL fill scripts
+
+Output is written through a large buffer to a temp file next to the
+destination and renamed into place only once it is complete, so a crash
+never leaves a truncated file behind. Output can optionally be gzip or zstd
+compressed (.gz / .zst) or written column-oriented (.json), picked from the
+file name. write_output() can also write a patch holding only the rows that
+differ from the output being replaced, so consumers can apply deltas instead
+of re-ingesting the whole history. The JSON caches and stores written by the
+other scripts go through the same temp-file-and-rename path via write_json().
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import stat
+import tempfile
+from typing import Dict, List, Any, Iterable, Optional, Sequence
+
+BUFFER_SIZE = 1 << 20
+DEFAULT_KEY_FIELDS = ('season_year', 'team_code')
+PATCH_OP_FIELD = '_op'
+
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+COLUMNAR_SUFFIX = '.json'
+
+
+def infer_compression(filename: str) -> Optional[str]:
+    """Pick compression from the file extension"""
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(filename)[1])
+
+
+def infer_columnar(filename: str) -> bool:
+    """Column-oriented files are JSON, e.g. out.json or out.json.gz"""
+    if infer_compression(filename):
+        filename = os.path.splitext(filename)[0]
+    return os.path.splitext(filename)[1] == COLUMNAR_SUFFIX
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd files require the 'zstandard' package (pip install zstandard)")
+    return zstandard
+
+
+def _open_compressed(raw, compression: Optional[str]):
+    """Wrap a binary file object in the requested compressor"""
+    if compression is None:
+        return raw
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0)
+    if compression == 'zstd':
+        return _zstandard().ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def _open_text(filename: str):
+    """Open a possibly compressed file for reading as text"""
+    compression = infer_compression(filename)
+    if compression is None:
+        return open(filename, 'r', encoding='utf-8', newline='')
+    if compression == 'gzip':
+        return gzip.open(filename, 'rt', encoding='utf-8', newline='')
+    if compression == 'zstd':
+        raw = open(filename, 'rb')
+        reader = _zstandard().ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8', newline='')
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def _replace(tmp_filename: str, filename: str):
+    """Move a finished temp file into place with the permissions a plain open() would give
+
+    mkstemp creates files readable only by their owner, so keep the mode of
+    the file being replaced, or use the umask default for a new file.
+    """
+    if os.path.exists(filename):
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(tmp_filename, mode)
+    os.replace(tmp_filename, filename)
+
+
+def _fieldnames(rows: List[Dict[str, Any]], fieldnames: Optional[Sequence[str]]) -> List[str]:
+    if fieldnames is not None:
+        return list(fieldnames)
+    # csv.DictReader stores surplus trailing values under None; they have no header
+    return [name for name in rows[0].keys() if name is not None] if rows else []
+
+
+def _write_csv(stream, rows: Iterable[Dict[str, Any]], fieldnames: List[str]):
+    writer = csv.DictWriter(stream, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def _write_columnar(stream, rows: List[Dict[str, Any]], fieldnames: List[str]):
+    columns = {name: [row.get(name, '') for row in rows] for name in fieldnames}
+    json.dump({'columns': fieldnames, 'data': columns}, stream, separators=(',', ':'))
+
+
+def write_rows(rows: List[Dict[str, Any]], filename: str,
+               fieldnames: Optional[Sequence[str]] = None,
+               compression: Optional[str] = 'infer',
+               columnar: Optional[bool] = None,
+               buffer_size: int = BUFFER_SIZE):
+    """Atomically write rows as CSV (or column-oriented JSON) to filename"""
+    fieldnames = _fieldnames(rows, fieldnames)
+    if compression == 'infer':
+        compression = infer_compression(filename)
+    if columnar is None:
+        columnar = infer_columnar(filename)
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filename), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb', buffering=buffer_size) as raw:
+            compressed = _open_compressed(raw, compression)
+            stream = io.TextIOWrapper(compressed, encoding='utf-8', newline='', write_through=False)
+            if columnar:
+                _write_columnar(stream, rows, fieldnames)
+            else:
+                _write_csv(stream, rows, fieldnames)
+            stream.flush()
+            stream.detach()
+            if compressed is not raw:
+                compressed.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        _replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+
+
+def write_json(data: Any, filename: str):
+    """Atomically write compact JSON to filename"""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filename), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, separators=(',', ':'))
+            file.flush()
+            os.fsync(file.fileno())
+        _replace(tmp_filename, filename)
+    except BaseException:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+
+
+def read_rows(filename: str) -> List[Dict[str, Any]]:
+    """Read rows back from a file written by write_rows; a missing file has none"""
+    if not os.path.exists(filename):
+        return []
+    with _open_text(filename) as file:
+        if not infer_columnar(filename):
+            return list(csv.DictReader(file))
+        table = json.load(file)
+    columns = [table['data'][name] for name in table['columns']]
+    return [dict(zip(table['columns'], values)) for values in zip(*columns)]
+
+
+def file_hash(filename: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _row_key(row: Dict[str, Any], key_fields: Sequence[str]) -> tuple:
+    return tuple(row.get(field) for field in key_fields)
+
+
+def _row_values(row: Dict[str, Any], fieldnames: List[str]) -> tuple:
+    return tuple(row.get(name) for name in fieldnames)
+
+
+def diff_rows(rows: List[Dict[str, Any]], base_rows: List[Dict[str, Any]],
+              fieldnames: List[str],
+              key_fields: Sequence[str] = DEFAULT_KEY_FIELDS) -> List[Dict[str, Any]]:
+    """Rows to upsert (new or changed) and keys to delete, relative to base_rows"""
+    base = {_row_key(row, key_fields): _row_values(row, fieldnames) for row in base_rows}
+
+    patch = []
+    seen = set()
+    for row in rows:
+        key = _row_key(row, key_fields)
+        seen.add(key)
+        if base.get(key) != _row_values(row, fieldnames):
+            patch.append({PATCH_OP_FIELD: 'upsert', **{name: row.get(name, '') for name in fieldnames}})
+    for key in base:
+        if key not in seen:
+            patch.append({PATCH_OP_FIELD: 'delete', **dict(zip(key_fields, key))})
+    return patch
+
+
+def write_patch(rows: List[Dict[str, Any]], base_rows: List[Dict[str, Any]], patch_filename: str,
+                key_fields: Sequence[str] = DEFAULT_KEY_FIELDS,
+                compression: Optional[str] = 'infer') -> int:
+    """Write only rows that differ from base_rows as CSV; returns rows written"""
+    fieldnames = _fieldnames(rows, None)
+    patch = diff_rows(rows, base_rows, fieldnames, key_fields)
+    write_rows(patch, patch_filename, fieldnames=[PATCH_OP_FIELD] + fieldnames,
+               compression=compression, columnar=False)
+    return len(patch)
+
+
+def write_output(rows: List[Dict[str, Any]], filename: str,
+                 patch_filename: Optional[str] = None) -> Optional[int]:
+    """Write rows to filename and, with patch_filename, the delta against the file it replaces
+
+    Returns the number of patch rows written, or None without a patch.
+    """
+    base_rows = read_rows(filename) if patch_filename else None
+    write_rows(rows, filename)
+    if patch_filename:
+        return write_patch(rows, base_rows, patch_filename)
+    return None
+
+
+def apply_patch(base_rows: List[Dict[str, Any]], patch_filename: str,
+                key_fields: Sequence[str] = DEFAULT_KEY_FIELDS) -> List[Dict[str, Any]]:
+    """Apply a patch file to base rows, keeping base order and appending new rows"""
+    with _open_text(patch_filename) as file:
+        patch = list(csv.DictReader(file))
+
+    upserts = {}
+    deletes = set()
+    for entry in patch:
+        op = entry.pop(PATCH_OP_FIELD)
+        key = _row_key(entry, key_fields)
+        if op == 'delete':
+            deletes.add(key)
+        else:
+            upserts[key] = entry
+
+    result = []
+    for row in base_rows:
+        key = _row_key(row, key_fields)
+        if key in deletes:
+            continue
+        result.append(upserts.pop(key, row))
+    result.extend(upserts.values())
+    return result
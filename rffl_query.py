@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Lazy query layer over the RFFL master data
+
+Queries are built as a plan (scan -> filter -> select / group_by -> sort)
+and only run on collect(). Before running, row predicates that sit directly
+on the scan are pushed into the loader and the scan is narrowed to the
+columns the rest of the plan references, so only needed columns of matching
+rows are ever materialized.
+
+    from rffl_query import scan, col, count, mean
+
+    (scan(master_file)
+        .filter(col('season_year').cast(int) <= 2010)
+        .group_by(col('team_code').alias('team'))
+        .agg(count().alias('seasons'), mean(col('rs_wins').cast(int)).alias('avg_wins'))
+        .filter(col('seasons') >= 3)
+        .collect())
+"""
+
+import csv
+import itertools
+import statistics
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+
+class Expr(ABC):
+    """A column expression, evaluated against one row at a time"""
+
+    name: str = ''
+
+    @abstractmethod
+    def columns(self) -> Set[str]:
+        """Source columns this expression reads"""
+
+    @abstractmethod
+    def evaluate(self, row: Dict[str, Any]) -> Any:
+        """Value of the expression for one row"""
+
+    def alias(self, name: str) -> 'Expr':
+        return Alias(self, name)
+
+    def apply(self, fn: Callable[[Any], Any]) -> 'Expr':
+        """Apply a Python function to the value (None passes through)"""
+        return Apply(self, fn)
+
+    def cast(self, type_fn: Callable[[Any], Any]) -> 'Expr':
+        """Convert the value with type_fn; blank values become None"""
+        return Apply(self, lambda v: type_fn(v) if v not in (None, '') else None)
+
+    def is_in(self, values: Iterable[Any]) -> 'Expr':
+        allowed = set(values)
+        return Apply(self, lambda v: v in allowed)
+
+    def is_null(self) -> 'Expr':
+        return Apply(self, lambda v: v is None)
+
+    def is_not_null(self) -> 'Expr':
+        return Apply(self, lambda v: v is not None)
+
+    def _binary(self, other: Any, op: Callable[[Any, Any], Any], symbol: str) -> 'Expr':
+        return BinaryOp(self, other if isinstance(other, Expr) else Lit(other), op, symbol)
+
+    def __eq__(self, other): return self._binary(other, lambda a, b: a == b, '==')
+    def __ne__(self, other): return self._binary(other, lambda a, b: a != b, '!=')
+    def __lt__(self, other): return self._binary(other, _null_safe(lambda a, b: a < b), '<')
+    def __le__(self, other): return self._binary(other, _null_safe(lambda a, b: a <= b), '<=')
+    def __gt__(self, other): return self._binary(other, _null_safe(lambda a, b: a > b), '>')
+    def __ge__(self, other): return self._binary(other, _null_safe(lambda a, b: a >= b), '>=')
+    def __add__(self, other): return self._binary(other, _null_safe(lambda a, b: a + b), '+')
+    def __sub__(self, other): return self._binary(other, _null_safe(lambda a, b: a - b), '-')
+    def __mul__(self, other): return self._binary(other, _null_safe(lambda a, b: a * b), '*')
+    def __truediv__(self, other): return self._binary(other, _null_safe(lambda a, b: a / b), '/')
+    def __and__(self, other): return self._binary(other, lambda a, b: bool(a) and bool(b), '&')
+    def __or__(self, other): return self._binary(other, lambda a, b: bool(a) or bool(b), '|')
+
+    def __invert__(self):
+        # Like comparisons, negating a missing value stays missing
+        return Apply(self, lambda v: None if v is None else not v)
+
+    __hash__ = None
+
+
+def _null_safe(op: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    """Comparisons and arithmetic with a missing value yield None"""
+    return lambda a, b: None if a is None or b is None else op(a, b)
+
+
+class Col(Expr):
+    def __init__(self, name: str):
+        self.name = name
+
+    def columns(self) -> Set[str]:
+        return {self.name}
+
+    def evaluate(self, row: Dict[str, Any]) -> Any:
+        return row.get(self.name)
+
+    def __repr__(self):
+        return f"col({self.name!r})"
+
+
+class Lit(Expr):
+    def __init__(self, value: Any):
+        self.value = value
+        self.name = repr(value)
+
+    def columns(self) -> Set[str]:
+        return set()
+
+    def evaluate(self, row: Dict[str, Any]) -> Any:
+        return self.value
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class Alias(Expr):
+    def __init__(self, expr: Expr, name: str):
+        self.expr = expr
+        self.name = name
+
+    def columns(self) -> Set[str]:
+        return self.expr.columns()
+
+    def evaluate(self, row: Dict[str, Any]) -> Any:
+        return self.expr.evaluate(row)
+
+    def __repr__(self):
+        return f"{self.expr!r}.alias({self.name!r})"
+
+
+class Apply(Expr):
+    def __init__(self, expr: Expr, fn: Callable[[Any], Any]):
+        self.expr = expr
+        self.fn = fn
+        self.name = expr.name
+
+    def columns(self) -> Set[str]:
+        return self.expr.columns()
+
+    def evaluate(self, row: Dict[str, Any]) -> Any:
+        return self.fn(self.expr.evaluate(row))
+
+    def __repr__(self):
+        return f"{self.expr!r}.apply(...)"
+
+
+class BinaryOp(Expr):
+    def __init__(self, left: Expr, right: Expr, op: Callable[[Any, Any], Any], symbol: str):
+        self.left = left
+        self.right = right
+        self.op = op
+        self.symbol = symbol
+        self.name = left.name
+
+    def columns(self) -> Set[str]:
+        return self.left.columns() | self.right.columns()
+
+    def evaluate(self, row: Dict[str, Any]) -> Any:
+        return self.op(self.left.evaluate(row), self.right.evaluate(row))
+
+    def __repr__(self):
+        return f"({self.left!r} {self.symbol} {self.right!r})"
+
+
+def col(name: str) -> Col:
+    return Col(name)
+
+
+def lit(value: Any) -> Lit:
+    return Lit(value)
+
+
+class Agg:
+    """An aggregate over the rows of a group; missing values are skipped"""
+
+    def __init__(self, expr: Optional[Expr], fn: Callable[[List[Any]], Any], name: str):
+        self.expr = expr
+        self.fn = fn
+        self.name = name
+
+    def alias(self, name: str) -> 'Agg':
+        return Agg(self.expr, self.fn, name)
+
+    def columns(self) -> Set[str]:
+        return self.expr.columns() if self.expr is not None else set()
+
+    def evaluate(self, rows: List[Dict[str, Any]]) -> Any:
+        if self.expr is None:
+            return self.fn(rows)
+        values = [v for v in (self.expr.evaluate(row) for row in rows) if v is not None]
+        return self.fn(values) if values else None
+
+
+def count() -> Agg:
+    return Agg(None, len, 'count')
+
+
+def sum_(expr: Expr) -> Agg:
+    return Agg(expr, sum, f"sum_{expr.name}")
+
+
+def mean(expr: Expr) -> Agg:
+    return Agg(expr, statistics.mean, f"mean_{expr.name}")
+
+
+def min_(expr: Expr) -> Agg:
+    return Agg(expr, min, f"min_{expr.name}")
+
+
+def max_(expr: Expr) -> Agg:
+    return Agg(expr, max, f"max_{expr.name}")
+
+
+def collect_list(expr: Expr) -> Agg:
+    return Agg(expr, list, f"list_{expr.name}")
+
+
+def _as_expr(value: Any) -> Expr:
+    return col(value) if isinstance(value, str) else value
+
+
+class LazyFrame:
+    """An immutable query plan; nothing is read until collect()"""
+
+    def __init__(self, plan: List[tuple]):
+        self.plan = plan
+
+    def _then(self, step: tuple) -> 'LazyFrame':
+        return LazyFrame(self.plan + [step])
+
+    def filter(self, predicate: Expr) -> 'LazyFrame':
+        return self._then(('filter', predicate))
+
+    def select(self, *exprs: Any) -> 'LazyFrame':
+        return self._then(('select', [_as_expr(e) for e in exprs]))
+
+    def group_by(self, *keys: Any) -> 'GroupBy':
+        return GroupBy(self, [_as_expr(k) for k in keys])
+
+    def sort(self, *keys: Any, descending: bool = False) -> 'LazyFrame':
+        return self._then(('sort', [_as_expr(k) for k in keys], descending))
+
+    def limit(self, n: int) -> 'LazyFrame':
+        return self._then(('limit', n))
+
+    def optimize(self) -> List[tuple]:
+        """Push filters on the source into the scan and prune unused columns"""
+        source, steps = self.plan[0], list(self.plan[1:])
+
+        pushed = []
+        while steps and steps[0][0] == 'filter':
+            pushed.append(steps.pop(0)[1])
+
+        # Columns needed from the source are those read by pushed predicates
+        # and by the first step that reshapes rows; later steps see its output
+        needed: Optional[Set[str]] = set()
+        for predicate in pushed:
+            needed |= predicate.columns()
+        if steps and steps[0][0] == 'select':
+            for expr in steps[0][1]:
+                needed |= expr.columns()
+        elif steps and steps[0][0] == 'aggregate':
+            for expr in steps[0][1]:
+                needed |= expr.columns()
+            for agg in steps[0][2]:
+                needed |= agg.columns()
+        else:
+            needed = None  # rows are returned as-is, so keep every column
+
+        return [(source[0], source[1], needed, pushed)] + steps
+
+    def explain(self) -> str:
+        """Describe the optimized plan, one step per line"""
+        lines = []
+        for step in self.optimize():
+            if step[0] in ('scan', 'rows'):
+                columns = 'all columns' if step[2] is None else ', '.join(sorted(step[2]))
+                lines.append(f"{step[0].upper()} [{columns}]")
+                for predicate in step[3]:
+                    lines.append(f"  pushed filter: {predicate!r}")
+            elif step[0] == 'filter':
+                lines.append(f"FILTER {step[1]!r}")
+            elif step[0] == 'select':
+                lines.append(f"SELECT {', '.join(e.name for e in step[1])}")
+            elif step[0] == 'aggregate':
+                lines.append(f"GROUP BY {', '.join(e.name for e in step[1])} "
+                             f"AGG {', '.join(a.name for a in step[2])}")
+            elif step[0] == 'sort':
+                lines.append(f"SORT {', '.join(e.name for e in step[1])}"
+                             f"{' DESC' if step[2] else ''}")
+            elif step[0] == 'limit':
+                lines.append(f"LIMIT {step[1]}")
+        return '\n'.join(lines)
+
+    def collect(self, optimize: bool = True) -> List[Dict[str, Any]]:
+        """Run the plan and return the result rows
+
+        optimize=False reads every column of every row and applies each step
+        as written, which is useful for checking the optimizer.
+        """
+        if optimize:
+            plan = self.optimize()
+        else:
+            plan = [(self.plan[0][0], self.plan[0][1], None, [])] + list(self.plan[1:])
+        source_kind, source, columns, predicates = plan[0]
+        if source_kind == 'scan':
+            rows: Iterable[Dict[str, Any]] = _scan_csv(source, columns, predicates)
+        else:
+            rows = _scan_rows(source, columns, predicates)
+
+        for step in plan[1:]:
+            rows = _run_step(step, rows)
+        return list(rows)
+
+
+class GroupBy:
+    def __init__(self, frame: LazyFrame, keys: List[Expr]):
+        self.frame = frame
+        self.keys = keys
+
+    def agg(self, *aggs: Agg) -> LazyFrame:
+        return self.frame._then(('aggregate', self.keys, list(aggs)))
+
+
+def _scan_csv(filename: str, columns: Optional[Set[str]],
+              predicates: List[Expr]) -> Iterator[Dict[str, Any]]:
+    """Read only the needed columns, and only build rows that match"""
+    with open(filename, 'r', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        # Later duplicate headers win, as with csv.DictReader
+        index = {name: i for i, name in enumerate(header)}
+        names = list(index) if columns is None else [c for c in index if c in columns]
+
+        predicate_columns = set()
+        for predicate in predicates:
+            predicate_columns |= predicate.columns()
+        filter_fields = [(name, index[name]) for name in names if name in predicate_columns]
+        fields = [(name, index[name]) for name in names]
+
+        for values in reader:
+            if not values:
+                continue
+            if predicates:
+                probe = {name: values[i] if i < len(values) else None for name, i in filter_fields}
+                if not all(predicate.evaluate(probe) for predicate in predicates):
+                    continue
+            yield {name: values[i] if i < len(values) else None for name, i in fields}
+
+
+def _scan_rows(rows: List[Dict[str, Any]], columns: Optional[Set[str]],
+               predicates: List[Expr]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        if all(predicate.evaluate(row) for predicate in predicates):
+            yield row if columns is None else {k: v for k, v in row.items() if k in columns}
+
+
+def _sort_key(values: List[Any]) -> tuple:
+    # None sorts first instead of raising
+    return tuple((v is not None, v) for v in values)
+
+
+def _run_step(step: tuple, rows: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    kind = step[0]
+    if kind == 'filter':
+        return (row for row in rows if step[1].evaluate(row))
+    if kind == 'select':
+        return ({expr.name: expr.evaluate(row) for expr in step[1]} for row in rows)
+    if kind == 'aggregate':
+        keys, aggs = step[1], step[2]
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(key.evaluate(row) for key in keys), []).append(row)
+        result = []
+        for group_key, group_rows in groups.items():
+            out = {key.name: value for key, value in zip(keys, group_key)}
+            for agg in aggs:
+                out[agg.name] = agg.evaluate(group_rows)
+            result.append(out)
+        return result
+    if kind == 'sort':
+        return sorted(rows, key=lambda row: _sort_key([k.evaluate(row) for k in step[1]]),
+                      reverse=step[2])
+    if kind == 'limit':
+        # Stop pulling rows (and reading the source) once n have been produced
+        return itertools.islice(rows, step[1])
+    raise ValueError(f"Unknown plan step: {kind}")
+
+
+def scan(filename: str) -> LazyFrame:
+    """Start a lazy query over a CSV file"""
+    return LazyFrame([('scan', filename)])
+
+
+def from_rows(rows: List[Dict[str, Any]]) -> LazyFrame:
+    """Start a lazy query over rows already in memory"""
+    return LazyFrame([('rows', rows)])
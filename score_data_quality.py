@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Score RFFL data quality for League.dataQualityScore
+
+Scores completeness per column, per season and per league, the share of
+values that were imputed by the fill scripts rather than observed, and
+consistency violations (W-L-T vs rs_gp, net vs credits - debits). Results
+are cached by file hash so rescoring an unchanged league costs nothing.
+"""
+
+import json
+import os
+from collections import defaultdict
+from typing import Dict, List, Any, Optional
+
+from rffl_output import file_hash, read_rows, write_json
+
+CACHE_FILE = ".rffl_quality_cache.json"
+CACHE_VERSION = 3
+
+PLACEHOLDER_PREFIXES = ('MISSING_TASK', 'AGENT')
+# The fill scripts and analyses treat a 0.00 score as "not recorded"
+ZERO_IS_MISSING = {'rs_pf', 'rs_pa', 'rs_proj_pf', 'rs_proj_pa'}
+MONEY_TOLERANCE = 0.01
+
+# Columns that only apply to some rows; a blank where they don't apply is not missing
+KORM_COLUMNS = {'korm_dues_usd', 'korm_finish_rank', 'korm_payout_usd'}
+PLAYOFF_GAME_PREFIXES = ('qf_', 'sf_', 'f_')
+POSTSEASON_COLUMNS = {'postseason_seed', 'postseason_bracket', 'postseason_wins',
+                      'postseason_losses', 'final_rank'}
+
+
+def load_columns(filename: str) -> Dict[str, List[str]]:
+    """Load a CSV (or any file write_rows can produce) as columns rather than rows"""
+    return columns_from_rows(read_rows(filename))
+
+
+def columns_from_rows(rows: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Turn already-parsed rows into columns"""
+    fieldnames = [name for name in rows[0] if name is not None] if rows else []
+    return {name: [row[name] for row in rows] for name in fieldnames}
+
+
+def align_columns(columns: Dict[str, List[str]], other: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Reorder another file's columns to match rows by (season_year, team_code)"""
+    keys = list(zip(columns['season_year'], columns['team_code']))
+    other_index = {key: i for i, key in enumerate(zip(other['season_year'], other['team_code']))}
+    positions = [other_index.get(key) for key in keys]
+    return {
+        name: [values[i] if i is not None else '' for i in positions]
+        for name, values in other.items()
+    }
+
+
+def is_observed(value: str, column: str = '') -> bool:
+    """A value counts as present if it is non-empty and not a placeholder"""
+    value = value.strip()
+    if column in ZERO_IS_MISSING and value == '0.00':
+        return False
+    return bool(value) and not value.startswith(PLACEHOLDER_PREFIXES)
+
+
+def applicable_rows(columns: Dict[str, List[str]]) -> Dict[str, List[bool]]:
+    """Per-column masks of the rows where a value is expected
+
+    co-owner only applies to co-owned teams, KORM details to KORM entrants,
+    playoff game columns to teams placed in a postseason bracket, and
+    postseason results to every season except one still in progress (the
+    latest season, while none of its results are recorded). Columns without
+    a mask apply to every row.
+    """
+    row_count = len(columns['season_year'])
+
+    def column(name):
+        return columns.get(name) or [''] * row_count
+
+    co_owned = [v.strip() == 'Yes' for v in column('is_co_owned')]
+    in_korm = [v.strip() != 'No' for v in column('korm_active')]
+    in_bracket = [is_observed(v) for v in column('postseason_bracket')]
+
+    seasons = columns['season_year']
+    latest = max(seasons, key=int) if row_count else None
+    has_results = any(
+        season == latest and (is_observed(wins) or is_observed(losses) or is_observed(rank))
+        for season, wins, losses, rank in zip(seasons, column('rs_wins'), column('rs_losses'), column('final_rank'))
+    )
+    played = [has_results or season != latest for season in seasons]
+
+    masks = {}
+    for name in columns:
+        if name == 'co-owner':
+            masks[name] = co_owned
+        elif name in KORM_COLUMNS:
+            masks[name] = in_korm
+        elif name.startswith(PLAYOFF_GAME_PREFIXES):
+            masks[name] = in_bracket
+        elif name in POSTSEASON_COLUMNS:
+            masks[name] = played
+    return masks
+
+
+def parse_number(value: str) -> Optional[float]:
+    """Parse plain or dollar-formatted numbers, None if missing"""
+    value = value.strip().replace('$', '').replace(',', '')
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def score_columns(columns: Dict[str, List[str]],
+                  filled_columns: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """Score one league's columns in a single pass over each column"""
+
+    seasons = columns['season_year']
+    row_count = len(seasons)
+    masks = applicable_rows(columns)
+
+    # Completeness and imputation, column by column, over the rows each column applies to
+    column_scores = {}
+    season_present = defaultdict(int)
+    season_applicable = defaultdict(int)
+    total_present = 0
+    total_applicable = 0
+    for name, values in columns.items():
+        applies = masks.get(name) or [True] * row_count
+        present_mask = [a and is_observed(v, name) for a, v in zip(applies, values)]
+        present = sum(present_mask)
+        applicable = sum(applies)
+        total_present += present
+        total_applicable += applicable
+        for season, a, ok in zip(seasons, applies, present_mask):
+            season_applicable[season] += a
+            season_present[season] += ok
+
+        column_score = {
+            'applicable': applicable,
+            'completeness': present / applicable if applicable else 1.0,
+        }
+        if filled_columns is not None and name in filled_columns:
+            imputed = sum(
+                1 for a, ok, filled in zip(applies, present_mask, filled_columns[name])
+                if a and not ok and is_observed(filled, name)
+            )
+            column_score['imputed'] = imputed
+            column_score['imputed_ratio'] = imputed / (present + imputed) if present + imputed else 0.0
+        column_scores[name] = column_score
+
+    season_scores = {
+        season: season_present[season] / applicable if applicable else 1.0
+        for season, applicable in sorted(season_applicable.items())
+    }
+
+    # Consistency checks
+    violations = defaultdict(int)
+    checked = defaultdict(int)
+
+    record_columns = [columns[c] for c in ['rs_wins', 'rs_losses', 'rs_ties', 'rs_gp']]
+    for wins, losses, ties, games in zip(*record_columns):
+        wins, losses, ties, games = (parse_number(v) for v in (wins, losses, ties, games))
+        if wins is None or losses is None or not games:
+            continue
+        checked['record_vs_rs_gp'] += 1
+        if wins + losses + (ties or 0) != games:
+            violations['record_vs_rs_gp'] += 1
+
+    money_columns = [columns[c] for c in
+                     ['owners_debits_total_usd', 'owners_credits_total_usd', 'owners_net_total_usd']]
+    for debits, credits, net in zip(*money_columns):
+        debits, credits, net = (parse_number(v) for v in (debits, credits, net))
+        if debits is None or credits is None or net is None:
+            continue
+        checked['net_vs_debits_credits'] += 1
+        if abs((credits - debits) - net) > MONEY_TOLERANCE:
+            violations['net_vs_debits_credits'] += 1
+
+    consistency = {
+        check: {
+            'checked': checked[check],
+            'violations': violations[check],
+            'rate': violations[check] / checked[check] if checked[check] else 0.0,
+        }
+        for check in ['record_vs_rs_gp', 'net_vs_debits_credits']
+    }
+
+    completeness = total_present / total_applicable if total_applicable else 0.0
+    total_checked = sum(checked.values())
+    violation_rate = sum(violations.values()) / total_checked if total_checked else 0.0
+    imputed_total = sum(c.get('imputed', 0) for c in column_scores.values())
+    imputed_ratio = imputed_total / (total_present + imputed_total) if total_present + imputed_total else 0.0
+    imputed_share = imputed_total / total_applicable if total_applicable else 0.0
+
+    # Observed, consistent data scores highest; imputed values count for half
+    quality = (completeness + 0.5 * imputed_share) * (1 - violation_rate)
+
+    return {
+        'rows': row_count,
+        'completeness': completeness,
+        'imputed_ratio': imputed_ratio,
+        'violation_rate': violation_rate,
+        'data_quality_score': round(quality * 100, 2),
+        'columns': column_scores,
+        'seasons': season_scores,
+        'consistency': consistency,
+    }
+
+
+def load_cache(cache_filename: str) -> Dict[str, Any]:
+    if not os.path.exists(cache_filename):
+        return {}
+    try:
+        with open(cache_filename, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get('version') == CACHE_VERSION else {}
+
+
+def save_cache(cache: Dict[str, Any], cache_filename: str):
+    cache['version'] = CACHE_VERSION
+    write_json(cache, cache_filename)
+
+
+def score_league(input_filename: str, filled_filename: Optional[str] = None,
+                 cache_filename: str = CACHE_FILE,
+                 rows: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Score one league's data file, reusing the cached result if unchanged"""
+    cache_key = file_hash(input_filename)
+    if filled_filename:
+        cache_key += ':' + file_hash(filled_filename)
+
+    # One entry per input file; a new version of the file replaces the old one
+    entry_name = os.path.abspath(input_filename)
+    cache = load_cache(cache_filename)
+    entries = cache.setdefault('entries', {})
+    entry = entries.get(entry_name)
+    if entry and entry['key'] == cache_key:
+        return entry['result']
+
+    columns = load_columns(input_filename) if rows is None else columns_from_rows(rows)
+    filled_columns = None
+    if filled_filename:
+        filled_columns = align_columns(columns, load_columns(filled_filename))
+    result = score_columns(columns, filled_columns)
+
+    entries[entry_name] = {'key': cache_key, 'result': result}
+    save_cache(cache, cache_filename)
+    return result
+
+
+def score_leagues(leagues: Dict[str, Dict[str, Optional[str]]],
+                  cache_filename: str = CACHE_FILE) -> Dict[str, Dict[str, Any]]:
+    """Score several leagues, keyed by league name"""
+    return {
+        league: score_league(files['input'], files.get('filled'), cache_filename)
+        for league, files in leagues.items()
+    }
+
+
+def print_quality_report(league: str, result: Dict[str, Any]):
+    """Print a summary of a league's quality scores"""
+    print(f"=== Data Quality: {league} ===\n")
+    print(f"  dataQualityScore: {result['data_quality_score']:.2f}")
+    print(f"  Completeness: {result['completeness']:.1%}")
+    print(f"  Imputed ratio: {result['imputed_ratio']:.1%}")
+    print(f"  Consistency violation rate: {result['violation_rate']:.1%}")
+
+    print("\n  Least complete columns:")
+    worst = sorted(result['columns'].items(), key=lambda c: c[1]['completeness'])[:10]
+    for name, column in worst:
+        print(f"    {name}: {column['completeness']:.1%}")
+
+    print("\n  Completeness by season:")
+    for season, completeness in result['seasons'].items():
+        print(f"    {season}: {completeness:.1%}")
+
+    print("\n  Consistency checks:")
+    for check, stats in result['consistency'].items():
+        print(f"    {check}: {stats['violations']}/{stats['checked']} violations")
+
+
+if __name__ == "__main__":
+    input_file = "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv"
+    filled_file = "RFFL_MASTER_DB_FILLED.csv"
+
+    results = score_leagues({'RFFL': {'input': input_file, 'filled': filled_file}})
+    for league, result in results.items():
+        print_quality_report(league, result)
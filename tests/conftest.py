@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The RFFL scripts live at the repository root rather than in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+MASTER_FILE = os.path.join(ROOT, "RFFL MASTER DB POWERBOOK - DATA NORMALIZED (MASTER INPUT) (1).csv")
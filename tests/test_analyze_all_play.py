@@ -0,0 +1,63 @@
+import csv
+
+from analyze_all_play import analyze_schedule_luck, compute_all_play
+
+
+def test_all_play_counts_wins_losses_and_ties():
+    scores = [
+        {'league': '', 'season': 2015, 'week': 1, 'team': team, 'score': score}
+        for team, score in [('A', 120.0), ('B', 100.0), ('C', 100.0), ('D', 90.0)]
+    ]
+    results = {r['team']: r for r in compute_all_play(scores)}
+
+    assert (results['A']['ap_wins'], results['A']['ap_losses'], results['A']['ap_ties']) == (3, 0, 0)
+    assert (results['B']['ap_wins'], results['B']['ap_losses'], results['B']['ap_ties']) == (1, 1, 1)
+    assert results['B']['expected_wins'] == 0.5
+    assert results['D']['expected_wins'] == 0.0
+
+
+def test_luck_ignores_playoff_weeks_and_counts_ties(tmp_path):
+    master_rows = [
+        {'season_year': '2008', 'team_code': 'A', 'rs_wins': '13', 'rs_losses': '0', 'rs_ties': '0', 'rs_gp': '13'},
+        {'season_year': '2008', 'team_code': 'B', 'rs_wins': '6', 'rs_losses': '6', 'rs_ties': '1', 'rs_gp': '13'},
+    ]
+    weekly_file = tmp_path / 'weekly.csv'
+    with open(weekly_file, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['season_year', 'week', 'team_code', 'score'])
+        for week in range(1, 15):
+            # Week 14 is a playoff week that A loses
+            writer.writerow([2008, week, 'A', 150 if week <= 13 else 50])
+            writer.writerow([2008, week, 'B', 100])
+
+    luck = {r['team']: r for r in analyze_schedule_luck(str(weekly_file), '', master_rows=master_rows)}
+
+    assert luck['A']['weeks'] == 13
+    assert luck['A']['luck'] == 0.0
+    assert luck['B']['actual_wins'] == 6.5
+    assert luck['B']['luck'] == 6.5
+
+
+def test_luck_is_only_matched_for_the_master_league(tmp_path):
+    master_rows = [
+        {'season_year': '2008', 'team_code': 'A', 'rs_wins': '2', 'rs_losses': '0', 'rs_ties': '0', 'rs_gp': '2'},
+        {'season_year': '2008', 'team_code': 'B', 'rs_wins': '0', 'rs_losses': '2', 'rs_ties': '0', 'rs_gp': '2'},
+    ]
+    weekly_file = tmp_path / 'weekly.csv'
+    with open(weekly_file, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['league_id', 'season_year', 'week', 'team_code', 'score'])
+        for league in ['rffl', 'other']:
+            for week in range(1, 4):
+                writer.writerow([league, 2008, week, 'A', 150])
+                writer.writerow([league, 2008, week, 'B', 100])
+
+    rows = analyze_schedule_luck(str(weekly_file), '', master_rows=master_rows, master_league='rffl')
+    luck = {(r['league'], r['team']): r for r in rows}
+
+    assert luck[('rffl', 'A')]['weeks'] == 2
+    assert luck[('rffl', 'A')]['luck'] == 0.0
+    # Same team codes in another league are neither truncated nor compared
+    assert luck[('other', 'A')]['weeks'] == 3
+    assert luck[('other', 'A')]['luck'] is None
+    assert luck[('other', 'B')]['actual_wins'] is None
@@ -0,0 +1,90 @@
+import csv
+import random
+
+from conftest import MASTER_FILE
+from materialize_leaderboards import SortedLeaderboard, LeaderboardStore, diff_rows, print_leaderboards
+
+
+def full_sort(values):
+    return sorted(((key, value) for key, value in values.items()), key=lambda e: (-e[1], e[0]))
+
+
+def test_top_breaks_ties_like_ranked():
+    board = SortedLeaderboard(k=2)
+    board.set('F-PCX', 3)
+    board.set('F-SEX', 2)
+    board.set('F-DKEG', 2)
+
+    assert board.top(2) == [('F-PCX', 3), ('F-DKEG', 2)]
+    assert board.rank_of('F-DKEG') == 2
+    assert SortedLeaderboard.from_dict(board.to_dict()).top(2) == board.top(2)
+
+
+def test_top_matches_full_sort_after_random_updates():
+    rng = random.Random(7)
+    board = SortedLeaderboard(k=5)
+    expected = {}
+    keys = [f"T{i}" for i in range(15)]
+
+    for _ in range(2000):
+        key = rng.choice(keys)
+        value = rng.choice([None, 0, 1, 1, 2, 2, 3, 5])
+        board.set(key, value)
+        if value is None:
+            expected.pop(key, None)
+        else:
+            expected[key] = value
+
+        ranking = full_sort(expected)
+        assert board.top() == ranking[:5]
+        assert board.top(8) == ranking[:8]
+        for rank, (key_at_rank, _) in enumerate(ranking, 1):
+            assert board.rank_of(key_at_rank) == rank
+
+    assert SortedLeaderboard.from_dict(board.to_dict()).top() == full_sort(expected)[:5]
+
+
+def snapshot(store):
+    return {
+        (scope, name): board.to_dict()['ranked']
+        for scope, boards in store.boards.items()
+        for name, board in boards.items()
+        if board.ranked
+    }
+
+
+def test_incremental_refresh_matches_full_rebuild(tmp_path):
+    with open(MASTER_FILE, 'r', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+
+    store = LeaderboardStore()
+    store.apply(diff_rows(rows, store, {}))
+
+    # Correct a score, crown a new champion, drop a row and add a season
+    edited = [dict(row) for row in rows[1:]]
+    edited[0]['rs_pf'] = '1999.99'
+    edited[5]['final_rank'] = '1'
+    new_row = dict(rows[0], season_year='2030')
+    edited.append(new_row)
+
+    store_file = str(tmp_path / 'leaderboards.json')
+    store.save(store_file)
+    store = LeaderboardStore.load(store_file)
+    changes = diff_rows(edited, store, {})
+    assert len(changes) == 4
+    store.apply(changes)
+
+    rebuilt = LeaderboardStore()
+    rebuilt.apply(diff_rows(edited, rebuilt, {}))
+    assert snapshot(store) == snapshot(rebuilt)
+
+
+def test_printed_values_keep_cents_and_whole_counts(capsys):
+    store = LeaderboardStore()
+    store.apply({'r1': {'team': 'F-SEX', 'season': 2015, 'pf': 10482.94, 'title': 1, 'playoffs': 1, 'net': 440.0}})
+    print_leaderboards(store)
+    output = capsys.readouterr().out
+
+    assert 'career_pf: F-SEX (10482.94)' in output
+    assert 'net_winnings: F-SEX (440.00)' in output
+    assert 'titles: F-SEX (1)' in output
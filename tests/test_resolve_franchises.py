@@ -0,0 +1,77 @@
+import json
+import shutil
+
+from conftest import MASTER_FILE
+from resolve_franchises import (
+    MAX_BLOCK_SIZE, FranchiseUnion, fuzzy_candidates, load_franchise_ids, resolve_franchises,
+)
+
+
+def team_season(season, team_code, name, owner, co_owner=''):
+    return {'season': season, 'team_code': team_code, 'name': name, 'owner': owner, 'co_owner': co_owner}
+
+
+def test_renamed_franchise_is_linked_across_codes(tmp_path):
+    franchise_ids = load_franchise_ids(MASTER_FILE, cache_filename=str(tmp_path / 'cache.json'))
+
+    assert franchise_ids['2002:SEX'] == franchise_ids['2009:TRIG'] == franchise_ids['2011:GFM'] == 'F-SEX'
+
+
+def test_same_season_team_seasons_never_merge():
+    # Same owner and same name, but two teams in one season can't be one franchise
+    team_seasons = [
+        team_season(2010, 'AAA', 'Stout Vikings', 'OWNER_A'),
+        team_season(2010, 'BBB', 'Stout Vikings', 'OWNER_A'),
+        team_season(2011, 'AAA', 'Stout Vikings', 'OWNER_A'),
+    ]
+    franchise_ids = resolve_franchises(team_seasons)
+
+    assert franchise_ids['2010:AAA'] != franchise_ids['2010:BBB']
+    assert franchise_ids['2011:AAA'] in (franchise_ids['2010:AAA'], franchise_ids['2010:BBB'])
+
+    union = FranchiseUnion(team_seasons)
+    assert union.union(0, 2)
+    assert not union.union(1, 2)
+    assert union.find(1) != union.find(0)
+
+
+def test_oversized_ngram_blocks_are_skipped():
+    team_seasons = [team_season(2000 + i, f'T{i}', 'Stout Vikings', f'OWNER_{i}') for i in range(MAX_BLOCK_SIZE)]
+    assert len(fuzzy_candidates(team_seasons)) == MAX_BLOCK_SIZE * (MAX_BLOCK_SIZE - 1) // 2
+
+    team_seasons.append(team_season(2100, 'TX', 'Stout Vikings', 'OWNER_X'))
+    assert fuzzy_candidates(team_seasons) == set()
+
+
+def test_co_ownership_loosens_the_name_threshold():
+    # 'Stout Vikings' and 'Stout Viking Raiders' share half their n-grams
+    strangers = [
+        team_season(2010, 'AAA', 'Stout Vikings', 'OWNER_A'),
+        team_season(2011, 'BBB', 'Stout Viking Raiders', 'OWNER_B'),
+    ]
+    franchise_ids = resolve_franchises(strangers)
+    assert franchise_ids['2010:AAA'] != franchise_ids['2011:BBB']
+
+    co_owned = [strangers[0], team_season(2011, 'BBB', 'Stout Viking Raiders', 'OWNER_B', co_owner='OWNER_A')]
+    franchise_ids = resolve_franchises(co_owned)
+    assert franchise_ids['2010:AAA'] == franchise_ids['2011:BBB']
+
+
+def test_edited_file_is_resolved_again(tmp_path):
+    input_file = tmp_path / 'master.csv'
+    cache_file = str(tmp_path / 'cache.json')
+    shutil.copy(MASTER_FILE, input_file)
+
+    first = load_franchise_ids(str(input_file), cache_filename=cache_file)
+    assert load_franchise_ids(str(input_file), cache_filename=cache_file) == first
+
+    # Recode the franchise's first season; the cached IDs must not be reused for the new file
+    text = input_file.read_text(encoding='utf-8')
+    input_file.write_text(text.replace('2002,VKGS,Stout Vikings,', '2002,STVK,Stout Vikings,', 1),
+                          encoding='utf-8')
+    second = load_franchise_ids(str(input_file), cache_filename=cache_file)
+
+    assert first['2003:VKGS'] == 'F-VKGS'
+    assert second['2002:STVK'] == second['2003:VKGS'] == 'F-STVK'
+    with open(cache_file, 'r', encoding='utf-8') as file:
+        assert json.load(file)['franchise_ids'] == second
@@ -0,0 +1,78 @@
+import builtins
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import rffl
+from conftest import MASTER_FILE, ROOT
+
+FILL_SCRIPTS = {
+    'fill_csv_data.py': rffl.FILLED_FILE,
+    'fill_all_pf_pa_data.py': rffl.COMPLETE_PF_PA_FILE,
+}
+
+
+def run_script(script, cwd):
+    return subprocess.run([sys.executable, os.path.join(ROOT, script)], cwd=cwd,
+                          capture_output=True, text=True, check=True).stdout
+
+
+@pytest.fixture
+def standalone_dir(tmp_path):
+    directory = tmp_path / 'standalone'
+    directory.mkdir()
+    shutil.copy(MASTER_FILE, directory / rffl.MASTER_FILE)
+    return directory
+
+
+@pytest.fixture
+def cli_dir(tmp_path, monkeypatch):
+    directory = tmp_path / 'cli'
+    directory.mkdir()
+    shutil.copy(MASTER_FILE, directory / rffl.MASTER_FILE)
+    monkeypatch.chdir(directory)
+    return directory
+
+
+def count_master_parses(monkeypatch):
+    """Record every text-mode open of the master file (hashing it reads bytes)"""
+    master = os.path.abspath(rffl.MASTER_FILE)
+    parses = []
+    real_open = builtins.open
+
+    def counting_open(file, mode='r', *args, **kwargs):
+        if isinstance(file, str) and 'b' not in mode and os.path.abspath(file) == master:
+            parses.append(mode)
+        return real_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', counting_open)
+    return parses
+
+
+def test_chain_matches_standalone_scripts_and_parses_master_once(standalone_dir, cli_dir, monkeypatch, capsys):
+    for script in FILL_SCRIPTS:
+        run_script(script, standalone_dir)
+    analysis = run_script('analyze_pf_pa_data.py', standalone_dir)
+
+    parses = count_master_parses(monkeypatch)
+    assert rffl.main(['fill-meta', 'fill-all', 'analyze']) == 0
+    output = capsys.readouterr().out
+
+    assert len(parses) == 1
+    for output_file in FILL_SCRIPTS.values():
+        assert (cli_dir / output_file).read_bytes() == (standalone_dir / output_file).read_bytes()
+    assert analysis in output
+
+
+def test_patch_runs_do_not_reparse_master(cli_dir, monkeypatch, capsys):
+    rffl.main(['fill-meta', 'fill-all', '--patch'])
+    parses = count_master_parses(monkeypatch)
+    rffl.main(['fill-meta', 'fill-all', 'analyze', '--patch'])
+    output = capsys.readouterr().out
+
+    assert len(parses) == 1
+    assert f"Wrote 0 changed rows to patch: {rffl.FILLED_FILE}.patch.csv" in output
+    assert f"Wrote 0 changed rows to patch: {rffl.COMPLETE_PF_PA_FILE}.patch.csv" in output
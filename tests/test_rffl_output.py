@@ -0,0 +1,84 @@
+import csv
+import os
+import stat
+
+import pytest
+
+from conftest import MASTER_FILE
+from rffl_output import write_rows, write_patch, write_output, apply_patch, write_json, read_rows
+
+
+def read_csv(filename):
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.fixture
+def base_file(tmp_path):
+    base = tmp_path / 'base.csv'
+    write_rows(read_csv(MASTER_FILE), str(base))
+    return str(base)
+
+
+@pytest.mark.parametrize('patch_name', ['out.patch.csv', 'out.patch.csv.gz'])
+def test_patch_round_trip(tmp_path, base_file, patch_name):
+    base_rows = read_csv(base_file)
+    rows = [dict(row) for row in base_rows]
+    rows[0]['rs_pf'] = '1234.56'
+    rows[5]['team_full_name'] = 'Renamed Team'
+    del rows[10]
+    rows.append({**rows[1], 'season_year': '2099'})
+
+    patch_file = str(tmp_path / patch_name)
+    assert write_patch(rows, base_rows, patch_file) == 4
+    assert apply_patch(base_rows, patch_file) == rows
+
+
+@pytest.mark.parametrize('output_name', ['out.csv', 'out.csv.gz', 'out.json'])
+def test_rerun_patches_against_the_previous_output(tmp_path, base_file, output_name):
+    rows = read_csv(base_file)
+    output_file = str(tmp_path / output_name)
+    patch_file = str(tmp_path / 'out.patch.csv')
+
+    assert write_output(rows, output_file, patch_file) == len(rows)
+    assert write_output(rows, output_file, patch_file) == 0
+    assert read_rows(patch_file) == []
+
+    rows[2]['rs_pf'] = '1111.11'
+    assert write_output(rows, output_file, patch_file) == 1
+    assert read_rows(output_file) == rows
+
+
+def test_zstd_patch_round_trip(tmp_path, base_file):
+    pytest.importorskip('zstandard')
+    base_rows = read_csv(base_file)
+    rows = [dict(row) for row in base_rows]
+    rows[3]['rs_pa'] = '999.99'
+
+    patch_file = str(tmp_path / 'out.patch.csv.zst')
+    assert write_patch(rows, base_rows, patch_file) == 1
+    assert apply_patch(base_rows, patch_file) == rows
+
+
+def test_new_files_get_umask_permissions(tmp_path):
+    umask = os.umask(0o027)
+    try:
+        write_rows([{'a': '1'}], str(tmp_path / 'rows.csv'))
+        write_json({'a': 1}, str(tmp_path / 'data.json'))
+    finally:
+        os.umask(umask)
+
+    for name in ['rows.csv', 'data.json']:
+        assert stat.S_IMODE(os.stat(tmp_path / name).st_mode) == 0o640
+    assert sorted(os.listdir(tmp_path)) == ['data.json', 'rows.csv']
+
+
+def test_rewrite_keeps_existing_permissions(tmp_path):
+    filename = tmp_path / 'rows.csv'
+    filename.write_text('a\n0\n')
+    os.chmod(filename, 0o604)
+
+    write_rows([{'a': '1'}], str(filename))
+
+    assert stat.S_IMODE(os.stat(filename).st_mode) == 0o604
+    assert read_csv(filename) == [{'a': '1'}]
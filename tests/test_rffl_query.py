@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import MASTER_FILE
+from rffl_query import Expr, scan, from_rows, col, count, mean, max_, _scan_csv
+from analyze_pf_pa_data import parse_score
+
+season = col('season_year').cast(int)
+pf = col('rs_pf').apply(parse_score)
+
+QUERIES = [
+    scan(MASTER_FILE).filter(season <= 2010).select(col('team_code'), season.alias('season')),
+    scan(MASTER_FILE).filter(pf.is_not_null()).filter(season > 2012)
+        .group_by(season.alias('season'))
+        .agg(count().alias('teams'), mean(pf).alias('avg_pf'), max_(pf).alias('max_pf'))
+        .filter(col('teams') >= 8).sort('season'),
+    scan(MASTER_FILE).filter(~(season <= 2010)).group_by('team_code')
+        .agg(count().alias('seasons')).filter(col('seasons') >= 3).sort('seasons', 'team_code', descending=True),
+    scan(MASTER_FILE).filter(col('team_code').is_in(['PCX', 'GFM']) | (col('final_rank') == '1'))
+        .sort('season_year').limit(5),
+]
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_optimized_plan_matches_unoptimized_run(query):
+    assert query.collect() == query.collect(optimize=False)
+
+
+def test_filters_and_projection_are_pushed_into_the_scan():
+    query = scan(MASTER_FILE).filter(season <= 2010).group_by('team_code').agg(count().alias('n'))
+    source = query.optimize()[0]
+
+    assert source[0] == 'scan'
+    assert source[2] == {'season_year', 'team_code'}
+    assert len(source[3]) == 1
+
+    rows = list(_scan_csv(MASTER_FILE, source[2], source[3]))
+    assert rows and all(set(row) == {'season_year', 'team_code'} for row in rows)
+    assert all(int(row['season_year']) <= 2010 for row in rows)
+
+
+def test_negated_predicate_keeps_missing_values_missing():
+    rows = [{'s': '2009'}, {'s': '2015'}, {'s': ''}]
+    year = col('s').cast(int)
+
+    assert from_rows(rows).filter(year > 2010).collect() == [{'s': '2015'}]
+    assert from_rows(rows).filter(~(year <= 2010)).collect() == [{'s': '2015'}]
+
+
+def test_limit_stops_reading_rows_once_it_has_enough():
+    evaluated = []
+    rows = [{'n': str(i)} for i in range(100)]
+    matches = col('n').apply(lambda v: evaluated.append(v) or True)
+
+    assert from_rows(rows).filter(matches).limit(3).collect() == rows[:3]
+    assert evaluated == ['0', '1', '2']
+
+
+def test_expressions_must_implement_columns_and_evaluate():
+    class Partial(Expr):
+        def columns(self):
+            return set()
+
+    with pytest.raises(TypeError):
+        Partial()
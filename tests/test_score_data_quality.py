@@ -0,0 +1,67 @@
+import json
+
+from conftest import MASTER_FILE
+from score_data_quality import columns_from_rows, load_columns, score_columns, score_league
+
+EMPTY_ROW = {
+    'season_year': '2025', 'team_code': 'PCX', 'rs_wins': '', 'rs_losses': '', 'rs_ties': '', 'rs_gp': '',
+    'owners_debits_total_usd': '', 'owners_credits_total_usd': '', 'owners_net_total_usd': '',
+    'rs_pf': '0.00', 'rs_pa': '0.00',
+}
+
+
+def test_league_without_finished_rows_scores_without_error():
+    result = score_columns(columns_from_rows([EMPTY_ROW]))
+
+    assert result['violation_rate'] == 0.0
+    assert result['consistency']['record_vs_rs_gp']['checked'] == 0
+
+
+def test_zero_pf_pa_counts_as_missing():
+    result = score_columns(columns_from_rows([EMPTY_ROW, dict(EMPTY_ROW, rs_pf='1201.50')]))
+
+    assert result['columns']['rs_pf']['completeness'] == 0.5
+    assert result['columns']['rs_pa']['completeness'] == 0.0
+
+
+def test_cache_keeps_one_entry_per_input_file(tmp_path):
+    input_file = tmp_path / 'master.csv'
+    cache_file = str(tmp_path / 'cache.json')
+    with open(MASTER_FILE, 'r', encoding='utf-8') as file:
+        input_file.write_text(file.read(), encoding='utf-8')
+
+    first = score_league(str(input_file), cache_filename=cache_file)
+    assert score_league(str(input_file), cache_filename=cache_file) == first
+
+    # Blank one team name, which changes the file and its score
+    text = input_file.read_text(encoding='utf-8')
+    input_file.write_text(text.replace('Stout Vikings,MCLAUGHLIN_PAT,', ',MCLAUGHLIN_PAT,', 1),
+                          encoding='utf-8')
+    second = score_league(str(input_file), cache_filename=cache_file)
+
+    assert second['columns']['team_full_name'] != first['columns']['team_full_name']
+    with open(cache_file, 'r', encoding='utf-8') as file:
+        assert len(json.load(file)['entries']) == 1
+
+
+def test_master_co_owner_column_is_complete_where_it_applies():
+    result = score_columns(load_columns(MASTER_FILE))
+
+    assert result['columns']['co-owner']['completeness'] == 1.0
+    assert result['columns']['co-owner']['applicable'] < result['rows']
+
+
+def test_blank_fields_that_do_not_apply_are_not_missing():
+    played = dict(EMPTY_ROW, season_year='2024', rs_wins='9', rs_losses='5', rs_ties='0', rs_gp='14',
+                  is_co_owned='No', **{'co-owner': ''}, korm_active='No', korm_dues_usd='',
+                  postseason_bracket='', qf_pf='', final_rank='3')
+    in_progress = dict(EMPTY_ROW, is_co_owned='Yes', **{'co-owner': 'SMITH_JOE'}, korm_active='Yes',
+                       korm_dues_usd='', postseason_bracket='', qf_pf='', final_rank='')
+    result = score_columns(columns_from_rows([played, in_progress]))
+    columns = result['columns']
+
+    assert columns['co-owner'] == {'applicable': 1, 'completeness': 1.0}
+    assert columns['korm_dues_usd'] == {'applicable': 1, 'completeness': 0.0}
+    assert columns['qf_pf'] == {'applicable': 0, 'completeness': 1.0}
+    # The latest season has no results yet, so its final_rank isn't expected
+    assert columns['final_rank'] == {'applicable': 1, 'completeness': 1.0}